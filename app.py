@@ -1,307 +1,423 @@
 import streamlit as st
 import sys
 import os
+import time
 from datetime import datetime
+from collections import deque
+from itertools import islice
 import json
 from typing import Dict, Any, List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 添加src目录到Python路径
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from models.player import Player
 from models.action import PlayerAction, ActionType
-from agent.smart_game_agent import SmartGameAgent
-from config.settings import Settings
 from src.data.data_manager import DataManager
 
-# 初始化数据管理器
-data_manager = DataManager()
+# 历史记录最大保留条数（界面只展示最近5~10条）
+MAX_HISTORY_SIZE = 50
+
+# 思考链步骤超过该数量时改为逐步查看
+MAX_INLINE_STEPS = 3
+
+# 总是触发Agent分析的动作类型，其余动作在冷却期内跳过分析
+_ALWAYS_ANALYZE = frozenset({ActionType.GAME_EXIT, ActionType.PURCHASE, ActionType.BATTLE_LOSE})
+_ANALYSIS_COOLDOWN_SECONDS = 30
+# 冷却期内跳过分析时的原因说明，同时用于区分通知文案
+_COOLDOWN_SKIP_REASON = "冷却期内跳过Agent分析"
+
+# 玩家面板读取的可选属性
+_PLAYER_SNAPSHOT_FIELDS = ("current_emotions", "emotion_history", "bot_risk_level", "churn_risk_level")
+
+# 动作生成器按钮定义：(分组标题, ((控件key, 按钮文字, 动作类型, 动作详情, 详情展示文本), ...))
+_BUTTON_GROUPS = (
+    ("⚔️ 战斗动作", (
+        ("btn_battle_win", "🏆 战斗胜利", ActionType.BATTLE_WIN, None, ""),
+        ("btn_battle_lose", "💀 战斗失败", ActionType.BATTLE_LOSE, None, ""),
+        ("btn_skill_use", "⚡ 技能使用", ActionType.SKILL_USE, None, ""),
+    )),
+    ("🎴 抽卡动作", (
+        ("btn_card_draw_rare", "✨ 抽到稀有卡", ActionType.CARD_DRAW, {"rarity": "legendary"}, "rarity=legendary"),
+        ("btn_card_draw_common", "📦 普通抽卡", ActionType.CARD_DRAW, {"rarity": "common"}, "rarity=common"),
+        ("btn_purchase", "💎 购买道具", ActionType.PURCHASE, None, ""),
+    )),
+    ("👥 社交动作", (
+        ("btn_chat", "💬 发送消息", ActionType.CHAT_PRIVATE, None, ""),
+        ("btn_gift", "🎁 赠送礼物", ActionType.TRADE, None, ""),
+        ("btn_game_exit", "🏃 退出游戏", ActionType.GAME_EXIT, None, ""),
+    )),
+)
+
+# 风险等级对应的显示颜色，未列出的等级按低风险显示
+_RISK_COLORS = {"HIGH": "red", "CRITICAL": "red", "MEDIUM": "orange", "LOW": "green"}
+_RISK_HTML_BY_LEVEL = {
+    level: f'<span style="color:{color}; font-weight:bold;">{{level}}</span>'
+    for level, color in _RISK_COLORS.items()
+}
+_DEFAULT_RISK_HTML = _RISK_HTML_BY_LEVEL["LOW"]
 
 
+def _render_risk_level(level: str) -> str:
+    """将风险等级渲染为带颜色的HTML片段"""
+    return _RISK_HTML_BY_LEVEL.get(level, _DEFAULT_RISK_HTML).format(level=level)
+
+
+# 页面布局：默认三栏布局，?layout=sidebar 时将玩家信息放入侧边栏
+LAYOUT = st.query_params.get("layout", "three-col")
+
 # 页面配置
 st.set_page_config(
     page_title="智能游戏Agent可视化界面",
     page_icon="🎮",
     layout="wide",
-    initial_sidebar_state="collapsed"  # 折叠侧边栏，因为我们将使用三栏布局
+    initial_sidebar_state="expanded" if LAYOUT == "sidebar" else "collapsed"
 )
 
+@st.cache_resource
+def get_data_manager() -> DataManager:
+    """获取进程级共享的数据管理器（每个服务进程只创建一次）"""
+    return DataManager()
+
+
+@st.cache_resource
+def get_agent(_dm: DataManager):
+    """获取进程级共享的Agent实例
+
+    参数以下划线开头，Streamlit不会对其做哈希。Agent相关的重量级模块
+    在此处延迟导入，只在首次创建Agent时加载
+    """
+    from agent.smart_game_agent import SmartGameAgent
+    from config.settings import Settings
+    return SmartGameAgent(_dm, Settings())
+
+
+data_manager = get_data_manager()
+
+@st.cache_data
+def default_player_payload() -> Dict[str, Any]:
+    """默认演示玩家的构造参数"""
+    return {
+        "player_id": "player_001",
+        "username": "起个名字真难",
+        "registration_date": datetime.now(),
+        "vip_level": 3,
+        "level": 15,
+        "experience": 2500,
+        "coins": 1000,
+        "gems": 50
+    }
+
+
 # 初始化session state
 if 'player' not in st.session_state:
-    st.session_state.player = Player(
-        player_id="player_001",
-        username="起个名字真难",
-        registration_date=datetime.now(),
-        vip_level=3,
-        level=15,
-        experience=2500,
-        coins=1000,
-        gems=50
-    )
+    st.session_state.player = Player(**default_player_payload())
 
-data_manager.update_player(st.session_state.player)
+# 仅在玩家数据发生变化时同步到数据管理器
+if st.session_state.get('_player_dirty', True):
+    data_manager.update_player(st.session_state.player)
+    st.session_state._player_dirty = False
 
 if 'agent' not in st.session_state:
-    settings = Settings()
-    st.session_state.agent = SmartGameAgent(data_manager , settings)
+    st.session_state.agent = get_agent(data_manager)
 
 
 if 'action_history' not in st.session_state:
-    st.session_state.action_history = []
+    st.session_state.action_history = deque(maxlen=MAX_HISTORY_SIZE)
 
 if 'intervention_history' not in st.session_state:
-    st.session_state.intervention_history = []
+    st.session_state.intervention_history = deque(maxlen=MAX_HISTORY_SIZE)
 
 def main():
-    st.title("🎮 智能游戏Agent可视化界面")
-    st.markdown("---")
+    st.markdown("# 🎮 智能游戏Agent可视化界面\n\n---")
     
-    # 创建三栏布局
-    col1, col2, col3 = st.columns(3)
+    if LAYOUT == "sidebar":
+        # 侧边栏布局：玩家信息放入侧边栏，主区域两栏
+        with st.sidebar:
+            player_panel()
+        col2, col3 = st.columns(2)
+    else:
+        # 三栏布局：第一栏为玩家状态与动作日志
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            player_panel()
     
-    # 第一栏：玩家状态与动作日志
-    with col1:
-        st.header("👤 玩家信息与近期动作")
-        
-        player = st.session_state.player
-        
-        # 玩家核心信息
-        st.subheader("📋 核心信息")
-        st.write(f"**玩家ID:** {player.player_id}")
-        st.write(f"**用户名:** {player.username}")
-        st.write(f"**等级:** {player.level}")
-        st.write(f"**VIP等级:** {player.vip_level}")
-        st.write(f"**总游戏时长:** {player.total_playtime_hours:.1f} 小时")
-        
-        formatted_date = player.registration_date.strftime("%Y-%m-%d")
-        st.write(f"**注册日期:** {formatted_date}")
-        
-        st.markdown("---")
-        
-        # 玩家情绪状态
-        st.subheader("😊 情绪状态")
-        
-        # 当前情绪
-        if hasattr(player, 'current_emotions') and player.current_emotions:
-            st.write("**当前情绪:**")
-            for emotion in player.current_emotions:
-                st.write(f"• {emotion.value.capitalize()}")
+    # 第二栏：Agent分析过程与结果
+    with col2:
+        analysis_panel()
+    
+    # 第三栏：动作生成器
+    with col3:
+        action_generator_panel()
+    
+    # 历史记录区域（移到底部）
+    history_panel()
+
+def player_panel():
+    """玩家状态与近期动作日志"""
+    player = st.session_state.player
+    snapshot = {name: getattr(player, name, None) for name in _PLAYER_SNAPSHOT_FIELDS}
+    
+    # 标题、玩家核心信息与情绪状态标题合并为一个元素
+    st.markdown(
+        "## 👤 玩家信息与近期动作\n\n"
+        "### 📋 核心信息\n\n"
+        f"**玩家ID:** {player.player_id}  \n"
+        f"**用户名:** {player.username}  \n"
+        f"**等级:** {player.level}  \n"
+        f"**VIP等级:** {player.vip_level}  \n"
+        f"**总游戏时长:** {player.total_playtime_hours:.1f} 小时  \n"
+        f"**注册日期:** {player.registration_date:%Y-%m-%d}\n\n"
+        "---\n\n"
+        "### 😊 情绪状态"
+    )
+    
+    # 当前情绪
+    if snapshot['current_emotions']:
+        st.markdown("**当前情绪:**  \n" + "  \n".join(
+            f"• {emotion.value.capitalize()}" for emotion in snapshot['current_emotions']
+        ))
+    else:
+        st.info("暂无情绪分析数据")
+    
+    # 情绪历史记录（使用expander节约空间）
+    with st.expander("📈 情绪历史记录"):
+        if snapshot['emotion_history']:
+            for i, emotion_record in enumerate(reversed(snapshot['emotion_history'][-5:])):
+                st.write(f"**{i+1}.** {emotion_record}")
         else:
-            st.info("暂无情绪分析数据")
-        
-        # 情绪历史记录（使用expander节约空间）
-        with st.expander("📈 情绪历史记录"):
-            if hasattr(player, 'emotion_history') and player.emotion_history:
-                for i, emotion_record in enumerate(reversed(player.emotion_history[-5:])):
-                    st.write(f"**{i+1}.** {emotion_record}")
-            else:
-                st.info("暂无情绪历史记录")
-        
-        # 风险评估
-        st.subheader("⚠️ 风险评估")
-        
-        # 机器人风险等级
-        if hasattr(player, 'bot_risk_level') and player.bot_risk_level:
-            risk_level_value = player.bot_risk_level.value.upper()
-            color = "red" if risk_level_value == "HIGH" else "orange" if risk_level_value == "MEDIUM" else "green"
-            st.markdown(f'🤖 **机器人风险:** <span style="color:{color}; font-weight:bold;">{risk_level_value}</span>', unsafe_allow_html=True)
+            st.info("暂无情绪历史记录")
+    
+    # 风险评估：机器人风险、流失风险与动作日志标题合并为一个元素
+    bot_html = _render_risk_level(snapshot['bot_risk_level'].value.upper()) if snapshot['bot_risk_level'] else "未知"
+    churn_html = _render_risk_level(snapshot['churn_risk_level'].value.upper()) if snapshot['churn_risk_level'] else "未知"
+    st.markdown(
+        "### ⚠️ 风险评估\n\n"
+        f"🤖 **机器人风险:** {bot_html}\n\n"
+        f"📉 **流失风险:** {churn_html}\n\n"
+        "---\n\n"
+        "### 🎯 近期动作日志",
+        unsafe_allow_html=True
+    )
+    
+    if st.session_state.action_history:
+        lines = ["**最近5条动作:**"]
+        for i, action_data in enumerate(islice(reversed(st.session_state.action_history), 5)):
+            timestamp = action_data['timestamp']
+            action_type = action_data['action_type']
+            details = action_data.get('details', '')
+            lines.append(f"**{i+1}.** `{timestamp}` - {action_type}")
+            if details:
+                lines.append(f"   └─ {details}")
+        st.markdown("  \n".join(lines))
+    else:
+        st.info("暂无动作历史")
+
+def analysis_panel():
+    """Agent分析过程与结果"""
+    # 显示最新的分析结果
+    if st.session_state.intervention_history:
+        latest_intervention = st.session_state.intervention_history[-1]
+        
+        # 核心分析结论：标题、结论与思考链标题合并为一个元素
+        parts = ["## 🤖 Agent 决策过程", "### 📊 核心分析结论"]
+        
+        # 显示是否干预
+        if latest_intervention.get('intervention_applied', False):
+            parts.append("**🚨 是否干预:** <span style='color:red; font-weight:bold;'>是</span>")
         else:
-            st.markdown('🤖 **机器人风险:** 未知')
-        
-        # 流失风险等级
-        if hasattr(player, 'churn_risk_level') and player.churn_risk_level:
-            churn_level_value = player.churn_risk_level.value.upper()
-            color = "red" if churn_level_value in ["HIGH", "CRITICAL"] else "orange" if churn_level_value == "MEDIUM" else "green"
-            st.markdown(f'📉 **流失风险:** <span style="color:{color}; font-weight:bold;">{churn_level_value}</span>', unsafe_allow_html=True)
+            parts.append("**✅ 是否干预:** <span style='color:green; font-weight:bold;'>否</span>")
+        
+        # 尝试从结果中提取干预原因、背景和玩家情绪总结
+        if 'reason' in latest_intervention:
+            parts.append(f"**干预原因:** {latest_intervention['reason']}")
+        
+        if 'context' in latest_intervention:
+            parts.append(f"**干预背景:** {latest_intervention['context']}")
+        
+        if 'player_mood' in latest_intervention:
+            parts.append(f"**玩家情绪总结:** {latest_intervention['player_mood']}")
+        
+        parts.extend(["---", "### 🧠 Agent 思考链"])
+        st.markdown("\n\n".join(parts), unsafe_allow_html=True)
+        
+        # 检查是否有intermediate_steps
+        steps = latest_intervention.get('intermediate_steps') or []
+        if steps:
+            if len(steps) > MAX_INLINE_STEPS and not st.toggle("展开全部步骤", key=f"steps_{id(latest_intervention)}"):
+                # 步骤较多时只渲染选中的一步
+                index = st.selectbox(
+                    "查看步骤",
+                    range(len(steps)),
+                    index=len(steps) - 1,
+                    format_func=lambda i: f"步骤 {i+1}",
+                    key=f"step_select_{id(latest_intervention)}"
+                )
+                render_step(index, steps[index])
+            else:
+                for i, step in enumerate(steps):
+                    render_step(i, step)
         else:
-            st.markdown('📉 **流失风险:** 未知')
+            st.info("暂无详细的思考过程记录")
         
         st.markdown("---")
         
-        # 近期动作日志
-        st.subheader("🎯 近期动作日志")
-        
-        if st.session_state.action_history:
-            st.write("**最近5条动作:**")
-            for i, action_data in enumerate(reversed(st.session_state.action_history[-5:])):
-                timestamp = action_data['timestamp']
-                action_type = action_data['action_type']
-                details = action_data.get('details', '')
-                st.write(f"**{i+1}.** `{timestamp}` - {action_type}")
-                if details:
-                    st.write(f"   └─ {details}")
-        else:
-            st.info("暂无动作历史")
-    
-    # 第二栏：Agent分析过程与结果
-    with col2:
-        st.header("🤖 Agent 决策过程")
-        
-        # 显示最新的分析结果
-        if st.session_state.intervention_history:
-            latest_intervention = st.session_state.intervention_history[-1]
-            
-            # 核心分析结论
-            st.subheader("📊 核心分析结论")
-            
-            # 从最新干预结果中提取关键信息
-            intervention_needed = latest_intervention.get('intervention_applied', False)
-            
-            # 显示是否干预
-            if intervention_needed:
-                st.markdown("**🚨 是否干预:** <span style='color:red; font-weight:bold;'>是</span>", unsafe_allow_html=True)
-            else:
-                st.markdown("**✅ 是否干预:** <span style='color:green; font-weight:bold;'>否</span>", unsafe_allow_html=True)
-            
-            # 尝试从结果中提取干预原因和背景
-            if 'reason' in latest_intervention:
-                st.write(f"**干预原因:** {latest_intervention['reason']}")
-            
-            if 'context' in latest_intervention:
-                st.write(f"**干预背景:** {latest_intervention['context']}")
+        # 完整的返回结果（打开开关后才序列化渲染）
+        if st.toggle("🔍 查看完整JSON结果", key=f"json_{id(latest_intervention)}"):
+            st.code(latest_intervention['_cached_json'], language='json')
             
-            # 显示玩家情绪总结（如果有的话）
-            if 'player_mood' in latest_intervention:
-                st.write(f"**玩家情绪总结:** {latest_intervention['player_mood']}")
-            
-            st.markdown("---")
-            
-            # Agent思考链
-            st.subheader("🧠 Agent 思考链")
-            
-            # 检查是否有intermediate_steps
-            if 'intermediate_steps' in latest_intervention and latest_intervention['intermediate_steps']:
-                for i, step in enumerate(latest_intervention['intermediate_steps']):
-                    st.markdown(f"**步骤 {i+1}:**")
-                    
-                    # 如果step是元组格式 (action, observation)
-                    if isinstance(step, tuple) and len(step) == 2:
-                        action, observation = step
-                        st.markdown(f"**思考:** {getattr(action, 'log', '正在分析...')}")
-                        st.markdown(f"**工具调用:** {getattr(action, 'tool', '未知工具')}")
-                        st.markdown(f"**观察:** {observation}")
-                    else:
-                        # 如果是其他格式，直接显示
-                        st.markdown(f"**内容:** {step}")
-                    
-                    st.markdown("---")
-            else:
-                st.info("暂无详细的思考过程记录")
-            
-            st.markdown("---")
-            
-            # 完整的返回结果
-            with st.expander("🔍 查看完整JSON结果"):
-                st.json(latest_intervention)
-                
-        else:
-            st.info("暂无分析结果，请在第三栏生成一些动作来触发Agent分析")
+    else:
+        st.header("🤖 Agent 决策过程")
+        st.info("暂无分析结果，请在第三栏生成一些动作来触发Agent分析")
+
+def render_step(index: int, step: Any):
+    """渲染Agent思考链中的单个步骤"""
+    # 如果step是元组格式 (action, observation)
+    if isinstance(step, tuple) and len(step) == 2:
+        action, observation = step
+        st.markdown(
+            f"**步骤 {index+1}:**\n\n"
+            f"**思考:** {getattr(action, 'log', '正在分析...')}\n\n"
+            f"**工具调用:** {getattr(action, 'tool', '未知工具')}\n\n"
+            f"**观察:** {observation}\n\n"
+            "---"
+        )
+    else:
+        # 如果是其他格式，直接显示
+        st.markdown(f"**步骤 {index+1}:**\n\n**内容:** {step}\n\n---")
+
+def action_generator_panel():
+    """动作生成器"""
+    st.header("🎮 动作生成器")
     
-    # 第三栏：动作生成器
-    with col3:
-        st.header("🎮 动作生成器")
-        
-        # 动作生成按钮区域
-        st.subheader("选择要生成的动作类型：")
-        
-        # 战斗相关动作
-        st.markdown("**⚔️ 战斗动作**")
-        
-        if st.button("🏆 战斗胜利", use_container_width=True):
-            generate_action(ActionType.BATTLE_WIN)
-        
-        if st.button("💀 战斗失败", use_container_width=True):
-            generate_action(ActionType.BATTLE_LOSE)
-        
-        if st.button("⚡ 技能使用", use_container_width=True):
-            generate_action(ActionType.SKILL_USE)
-        
-        # 抽卡相关动作
-        st.markdown("**🎴 抽卡动作**")
-        
-        if st.button("✨ 抽到稀有卡", use_container_width=True):
-            generate_action(ActionType.CARD_DRAW, {"rarity": "legendary"})
-        
-        if st.button("📦 普通抽卡", use_container_width=True):
-            generate_action(ActionType.CARD_DRAW, {"rarity": "common"})
-        
-        if st.button("💎 购买道具", use_container_width=True):
-            generate_action(ActionType.ITEM_PURCHASE)
-        
-        # 社交相关动作
-        st.markdown("**👥 社交动作**")
-        
-        if st.button("💬 发送消息", use_container_width=True):
-            generate_action(ActionType.CHAT_MESSAGE)
-        
-        if st.button("🎁 赠送礼物", use_container_width=True):
-            generate_action(ActionType.GIFT_SEND)
-        
-        if st.button("🏃 退出游戏", use_container_width=True):
-            generate_action(ActionType.GAME_EXIT)
+    # 最近一次动作的通知，写入占位元素中原地更新；只渲染一次，之后的重新运行不再显示
+    notify = st.empty()
+    with notify.container():
+        for level, message in st.session_state.pop('_notifications', ()):
+            getattr(st, level)(message)
     
-    # 历史记录区域（移到底部）
-    st.markdown("---")
-    st.header("📜 历史记录")
+    # 动作生成按钮区域
+    st.markdown("### 选择要生成的动作类型：")
+    
+    for group_title, buttons in _BUTTON_GROUPS:
+        st.markdown(f"**{group_title}**")
+        for key, label, action_type, details, details_text in buttons:
+            # 在回调中生成动作：回调先于本次运行执行，各面板直接读到最新的历史数据，无需再整页刷新
+            st.button(
+                label,
+                key=key,
+                use_container_width=True,
+                on_click=generate_action,
+                args=(action_type, details, details_text)
+            )
+
+def history_panel():
+    """历史记录"""
+    st.markdown("---\n\n## 📜 历史记录")
     
     # 动作历史
     with st.expander("🎯 动作历史", expanded=False):
         if st.session_state.action_history:
-            for i, action_data in enumerate(reversed(st.session_state.action_history[-10:])):
-                st.write(f"**{i+1}.** {action_data['timestamp']} - {action_data['action_type']} - {action_data.get('details', '')}")
+            st.markdown("  \n".join(
+                f"**{i+1}.** {action_data['timestamp']} - {action_data['action_type']} - {action_data.get('details', '')}"
+                for i, action_data in enumerate(islice(reversed(st.session_state.action_history), 10))
+            ))
         else:
             st.info("暂无动作历史")
     
     # 干预历史
     with st.expander("🤖 Agent干预历史", expanded=False):
         if st.session_state.intervention_history:
-            for i, intervention in enumerate(reversed(st.session_state.intervention_history[-5:])):
-                st.write(f"**干预 {i+1}:**")
-                st.json(intervention)
-                st.markdown("---")
+            for i, intervention in enumerate(islice(reversed(st.session_state.intervention_history), 5)):
+                divider = "---\n\n" if i else ""
+                st.markdown(f"{divider}**干预 {i+1}:** {intervention.get('reason') or intervention.get('intervention_reason', '未知')}")
+                if st.toggle("显示完整JSON", key=f"history_json_{id(intervention)}"):
+                    st.code(intervention['_cached_json'], language='json')
         else:
             st.info("暂无干预历史")
 
-def generate_action(action_type: ActionType, details: Dict[str, Any] = None):
-    """生成指定类型的动作并触发Agent分析"""
+def _serialize_result(result: Dict[str, Any]) -> str:
+    """将干预结果序列化为格式化的JSON字符串（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(
+            result,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_DATACLASS
+        ).decode()
+    return json.dumps(result, default=str, ensure_ascii=False, indent=2)
+
+def generate_action(action_type: ActionType, details: Dict[str, Any] = None, details_text: str = ""):
+    """生成指定类型的动作并触发Agent分析
+
+    Args:
+        action_type: 动作类型
+        details: 动作详情
+        details_text: 预先格式化的详情展示文本
+    """
     try:
-        # 创建动作对象
+        # 创建动作对象（动作ID与时间戳共用同一个时间点）
+        now = datetime.now()
         action = PlayerAction(
-            action_id=f"action_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}",
+            action_id=f"action_{int(now.timestamp() * 1_000_000)}",
             action_type=action_type,
             player_id=st.session_state.player.player_id,
-            timestamp=datetime.now(),
+            timestamp=now,
             metadata=details or {}
         )
         
-        # 记录动作历史
+        # 记录动作历史（时间戳只在创建时格式化一次，渲染时直接复用）
         action_data = {
-            "timestamp": action.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
             "action_type": action_type.value,
-            "details": str(details) if details else ""
+            "details": details_text
         }
         st.session_state.action_history.append(action_data)
         
-        # 触发Agent分析
-        with st.spinner("Agent正在分析中..."):
-            result = st.session_state.agent.process_player_action(
-                st.session_state.player,
-                action
-            )
+        # 冷却期内的低风险动作只记录，不触发Agent分析
+        now_monotonic = time.monotonic()
+        if (action_type not in _ALWAYS_ANALYZE
+                and now_monotonic - st.session_state.get('_last_analysis_ts', 0.0) < _ANALYSIS_COOLDOWN_SECONDS):
+            data_manager.add_action(action)
+            result = {
+                "success": True,
+                "intervention_needed": False,
+                "reason": _COOLDOWN_SKIP_REASON,
+                "timestamp": action.timestamp.isoformat()
+            }
+        else:
+            # 触发Agent分析
+            with st.spinner("Agent正在分析中..."):
+                result = st.session_state.agent.process_player_action(
+                    st.session_state.player,
+                    action
+                )
+            st.session_state._last_analysis_ts = now_monotonic
         
         # 记录干预结果
         if result:
+            # 预先序列化一次，之后每次重新运行直接复用该字符串
+            result['_cached_json'] = _serialize_result(result)
             st.session_state.intervention_history.append(result)
             
-            # 显示成功消息
-            st.success(f"✅ 成功生成{action_type.value}动作并完成Agent分析！")
+            # Agent执行了干预时会修改玩家状态，下次运行时需要重新同步
+            if result.get('intervention_needed'):
+                st.session_state._player_dirty = True
+            
+            # 记录通知，由动作生成器的占位元素在下一次运行时渲染
+            if result.get('reason') == _COOLDOWN_SKIP_REASON:
+                notifications = [("success", f"✅ 成功生成{action_type.value}动作（{_COOLDOWN_SKIP_REASON}）")]
+            else:
+                notifications = [("success", f"✅ 成功生成{action_type.value}动作并完成Agent分析！")]
             
             # 如果有干预建议，显示通知
             if result.get('intervention_applied'):
-                st.info("🤖 Agent已应用干预策略！")
-        
-        # 刷新页面以显示最新结果
-        st.rerun()
+                notifications.append(("info", "🤖 Agent已应用干预策略！"))
+            st.session_state._notifications = notifications
         
     except Exception as e:
         st.error(f"❌ 生成动作时出错: {str(e)}")
@@ -12,11 +12,19 @@
 
 import os
 import sys
+import atexit
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
 from datetime import datetime
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -30,15 +38,29 @@ from src.triggers.behavior_analyzer import BehaviorAnalyzer
 from src.scenarios.frustration_scenario import FrustrationScenario
 from src.scenarios.satisfion_scenario import SatisfionScenario
 def setup_logging():
-    """设置日志"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler('demo.log', encoding='utf-8')
-        ]
-    )
+    """设置日志
+    
+    日志记录先进入队列，由后台监听线程写入控制台和文件，避免业务代码阻塞在I/O上
+    """
+    # 不需要线程和进程信息，省去每条记录的查询
+    logging.logThreads = False
+    logging.logProcesses = False
+    
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler = logging.FileHandler('demo.log', encoding='utf-8')
+    stream_handler.setFormatter(formatter)
+    file_handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # 直接挂到根日志器上，basicConfig 会给处理器设置格式化器导致重复格式化
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     # 设置第三方库的日志级别
     logging.getLogger('httpx').setLevel(logging.WARNING)
@@ -68,7 +90,14 @@ def print_step(step: str):
 def print_result(result: dict, title: str = "结果"):
     """打印结果"""
     print(f"\n📊 {title}:")
-    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    if orjson is not None:
+        print(orjson.dumps(
+            result,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode())
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
 
 def demo_basic_functionality():
     """演示基础功能"""
@@ -104,36 +133,16 @@ def demo_basic_functionality():
     
     # 生成行为数据
     print_step("生成玩家行为数据")
+    # 前两个玩家额外生成满意行为，所有序列一次生成、一次写入
+    specs = [(player.player_id, "normal", 10) for player in players]
+    specs += [(player.player_id, "satisfaction", 5) for player in players[:2]]
+    data_manager.add_actions(mock_generator.generate_action_batch(specs))
+    
     for i, player in enumerate(players):
-        # 生成正常行为
-        normal_actions = mock_generator.generate_action_sequence(
-            player.player_id, "normal", count=10
-        )
-        for action in normal_actions:
-            data_manager.add_action(action)
-        
-        # # 为部分玩家生成异常行为（受挫、失败等）
-        # if i < 2:  # 前两个玩家生成异常行为
-        #     frustration_actions = mock_generator.generate_action_sequence(
-        #         player.player_id, "frustration", count=5
-        #     )
-        #     for action in frustration_actions:
-        #         data_manager.add_action(action)
-        #     print(f"   ✅ 为 {player.username} 生成了 {len(normal_actions)} 个正常行为 + {len(frustration_actions)} 个异常行为")
-        # else:
-        #     print(f"   ✅ 为 {player.username} 生成了 {len(normal_actions)} 个正常行为")
-
-        
-               # 为部分玩家生成异常行为（受挫、失败等）
-        if i < 2:  # 前两个玩家生成满意行为
-            satisfaction_actions = mock_generator.generate_action_sequence(
-                player.player_id, "satisfaction", count=5
-            )
-            for action in satisfaction_actions:
-                data_manager.add_action(action)
-            print(f"   ✅ 为 {player.username} 生成了 {len(normal_actions)} 个正常行为 + {len(satisfaction_actions)} 个满意行为")
+        if i < 2:
+            print(f"   ✅ 为 {player.username} 生成了 10 个正常行为 + 5 个满意行为")
         else:
-            print(f"   ✅ 为 {player.username} 生成了 {len(normal_actions)} 个正常行为")
+            print(f"   ✅ 为 {player.username} 生成了 10 个正常行为")
     
     # 展示数据统计
     print_step("数据统计概览")
@@ -223,6 +232,14 @@ def demo_agent_system(data_manager: DataManager, settings: Settings):
     
     return agent
 
+def iter_report_records(report_path: Path, record_type: str):
+    """逐行读取场景JSONL报告中指定类型的记录"""
+    with open(report_path, 'rb') as report_lines:
+        for line in report_lines:
+            record = orjson.loads(line) if orjson is not None else json.loads(line)
+            if record['record_type'] == record_type:
+                yield record
+
 def demo_satisfion_scenario(data_manager: DataManager, settings: Settings, agent):
     """演示受挫场景"""
     print_section("第五部分：满意场景完整演示")
@@ -241,9 +258,11 @@ def demo_satisfion_scenario(data_manager: DataManager, settings: Settings, agent
         print("⏳ 这可能需要几分钟时间...")
         
         try:
-            
-
-            full_result = scenario.run_satisfion_complete_scenario()
+            # 干预和邮件记录在产生时逐行写入JSONL，返回结果只含汇总
+            report_path = Path(settings.data_dir) / "reports" / f"satisfion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, 'wb') as report_stream:
+                full_result = scenario.run_satisfion_complete_scenario(report_stream=report_stream)
             
             if "error" not in full_result:
                 print(f"✅ 完整场景测试完成")
@@ -258,11 +277,11 @@ def demo_satisfion_scenario(data_manager: DataManager, settings: Settings, agent
                 print(f"   - 整体成功: {'是' if success_indicators.get('overall_success') else '否'}")
                 print(f"   - 成功分数: {success_indicators.get('success_score', 0):.2f}")
                 
-                # 显示干预结果
-                interventions = full_result.get('interventions', [])
-                if interventions:
-                    print(f"\n🎯 干预措施 ({len(interventions)} 个):")
-                    for intervention in interventions:
+                # 显示干预结果（从JSONL逐行读取）
+                intervention_count = full_result['interventions']['count']
+                if intervention_count:
+                    print(f"\n🎯 干预措施 ({intervention_count} 个):")
+                    for intervention in iter_report_records(report_path, 'intervention'):
                         if 'error' not in intervention:
                             result = intervention.get('result', {})
                             print(f"   - 条件: {intervention['condition_name']}")
@@ -271,10 +290,10 @@ def demo_satisfion_scenario(data_manager: DataManager, settings: Settings, agent
                                 print(f"     措施: {', '.join(result['actions_taken'])}")
                 
                 # 显示邮件历史
-                mail_history = full_result.get('mail_history', [])
-                if mail_history:
-                    print(f"\n📧 发送邮件 ({len(mail_history)} 封):")
-                    for mail in mail_history:
+                mail_count = full_result['mail_history']['count']
+                if mail_count:
+                    print(f"\n📧 发送邮件 ({mail_count} 封):")
+                    for mail in iter_report_records(report_path, 'mail'):
                         print(f"   - {mail['title']}: {mail['content']}")
                         if mail['attachments']:
                             print(f"     附件: {mail['attachments']}")
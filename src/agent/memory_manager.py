@@ -1,9 +1,136 @@
-from token import OP
-from typing import Dict, List, Optional, Any
-from langchain.memory import ConversationBufferWindowMemory
+from typing import Deque, Dict, Iterator, List, Literal, Optional, Any, Tuple
+from collections import OrderedDict, deque
+from itertools import islice
+from dataclasses import dataclass, field
+from operator import itemgetter
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 import json
-from datetime import datetime, timedelta
+import sys
+import time
+from datetime import datetime
+from weakref import WeakValueDictionary
+
+import numpy as np
+from sortedcontainers import SortedKeyList
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 消息角色标记
+ROLE_HUMAN = 0
+ROLE_AI = 1
+
+# 以角色标记为下标的查找表
+_ROLE_EXPORT_TYPES = ("human", "ai")
+_ROLE_DISPLAY_NAMES = ("用户", "AI")
+_ROLE_MESSAGE_CLASSES = (HumanMessage, AIMessage)
+
+# 记忆摘要中上下文JSON的最大字符数
+SUMMARY_CONTEXT_LIMIT = 2048
+
+# 已清除记忆对象池的容量上限
+MEMORY_POOL_SIZE = 512
+
+# 记忆统计结果的缓存有效期（秒）
+STATS_CACHE_TTL = 5.0
+
+
+def _summarize_trigger_v2(content: Optional[Dict[str, Any]],
+                          context: Optional[Dict[str, Any]]) -> str:
+    """trigger_event_v2 交互的摘要"""
+    summary_parts = []
+    if content:
+        analysis = content.get("intervention_analysis")
+        if analysis is not None:
+            if analysis.get("intervention_needed", False):
+                summary_parts.append(f"检测到需要干预: {analysis.get('intervention_reason', '未知原因')}")
+                summary_parts.append(f"建议干预类型: {analysis.get('suggested_intervention_type', '未指定')}")
+            else:
+                summary_parts.append("分析完成，无需干预")
+            
+            if "player_mood_summary" in analysis:
+                summary_parts.append(f"玩家情绪: {analysis['player_mood_summary']}")
+        
+        result = content.get("execution_result")
+        if result is not None:
+            if result.get("success", False):
+                summary_parts.append("干预执行成功")
+            else:
+                summary_parts.append(f"干预执行失败: {result.get('error', '未知错误')}")
+    
+    return " | ".join(summary_parts) if summary_parts else "交互记录"
+
+
+def _summarize_action(content: Optional[Dict[str, Any]],
+                      context: Optional[Dict[str, Any]]) -> str:
+    """player_action 交互的摘要"""
+    if content and "action" in content:
+        return f"玩家行为: {content['action'].get('action_type', '未知行为')}"
+    return "交互记录"
+
+
+def _default_summary(interaction_type: str, content: Optional[Dict[str, Any]]) -> str:
+    """未登记交互类型的通用摘要"""
+    if content:
+        return f"交互类型: {interaction_type} | 包含 {len(content)} 项数据"
+    return f"交互类型: {interaction_type}"
+
+
+def _format_content_entries(entries) -> List[Dict[str, Any]]:
+    """把内部的浮点时间戳转换为ISO格式的内容记录"""
+    return [
+        {"timestamp": datetime.fromtimestamp(entry["ts"]).isoformat(), "data": entry["data"]}
+        for entry in entries
+    ]
+
+
+
+def _export_metadata(player_id: str, memory: "PlayerMemory") -> Dict[str, Any]:
+    """导出记忆中除消息以外的数据"""
+    return {
+        "player_id": player_id,
+        "context": memory.context,
+        "last_interaction_time": (
+            datetime.fromtimestamp(memory.last_interaction_time)
+            if memory.last_interaction_time else None
+        ),
+        "interaction_count": memory.interaction_count
+    }
+
+
+def _export_messages(messages) -> Iterator[Dict[str, Any]]:
+    """逐条把 (角色, 内容) 元组转换为导出格式"""
+    for role, text in messages:
+        yield {
+            "type": _ROLE_EXPORT_TYPES[role],
+            "content": text,
+            "timestamp": None
+        }
+
+# 交互类型 -> 摘要构建函数
+_SUMMARY_BUILDERS = {
+    "trigger_event_v2": _summarize_trigger_v2,
+    "player_action": _summarize_action,
+}
+
+
+@dataclass(slots=True, weakref_slot=True)
+class PlayerMemory:
+    """单个玩家的记忆数据
+
+    消息以 (角色, 内容) 元组保存在定长deque中，只保留最近的窗口，
+    仅在需要时才转换为LangChain消息对象
+    """
+    messages: Deque[Tuple[int, str]]
+    context: Dict[str, Any] = field(default_factory=dict)
+    content: Dict[str, Deque[Dict[str, Any]]] = field(default_factory=dict)
+    last_interaction_time: float = 0.0  # time.time() 时间戳
+    interaction_count: int = 0
+    # (生成时的最后交互时间, 详细程度, 摘要)，交互或上下文未变化时直接复用
+    summary_cache: Optional[Tuple[float, str, str]] = None
+
 
 class MemoryManager:
     """智能体记忆管理器
@@ -11,34 +138,132 @@ class MemoryManager:
     管理与玩家的对话历史和上下文信息
     """
     
-    def __init__(self, memory_window_size: int = 10):
+    def __init__(self, memory_window_size: int = 10, max_players: int = 1000):
         """初始化记忆管理器
         
         Args:
             memory_window_size: 记忆窗口大小，保留最近N轮对话
+            max_players: 强引用保留的最近活跃玩家数量上限
         """
         self.memory_window_size = memory_window_size
-        self.player_memories: Dict[str, ConversationBufferWindowMemory] = {}
-        self.player_contexts: Dict[str, Dict[str, Any]] = {}
-        self.player_content: Dict[str, Dict[str, Any]] = {}
-        self.last_interaction_time: Dict[str, datetime] = {}
+        # 每个玩家每种交互类型保留的内容条数上限
+        self.max_content_history = memory_window_size * 4
+        self.max_players = max_players
+        # 记忆对象只由 _lru 强引用，被淘汰且没有外部引用时自动回收
+        self.player_memories: WeakValueDictionary[str, PlayerMemory] = WeakValueDictionary()
+        self._lru: OrderedDict[str, PlayerMemory] = OrderedDict()
+        # 玩家ID -> 最后交互时间，以及按时间排序的 (最后交互时间, 玩家ID) 索引，
+        # 活跃度查询和过期清理都只需二分定位；尚无交互的玩家不登记，也不会被过期清理
+        self._recent_players: Dict[str, float] = {}
+        self._activity_index: SortedKeyList = SortedKeyList(key=itemgetter(0))
+        # 所有玩家交互次数之和，随交互和清理增量维护
+        self._total_interactions = 0
+        # (生成时间, 玩家数, 总交互次数, 统计结果)，计数未变且未过期时直接复用
+        self._stats_cache: Optional[Tuple[float, int, int, Dict[str, Any]]] = None
+        # 最后交互时间的连续数组，供批量判断活跃度；玩家ID -> 数组下标，释放的下标复用
+        self._ts_array = np.full(64, -np.inf, dtype=np.float64)
+        self._pid_index: Dict[str, int] = {}
+        self._free_indices: List[int] = []
+        # 被显式清除的记忆对象，新玩家优先复用；超出容量时丢弃最早放入的对象
+        self._memory_pool: Deque[PlayerMemory] = deque(maxlen=MEMORY_POOL_SIZE)
     
-    def get_player_memory(self, player_id: str) -> ConversationBufferWindowMemory:
+    def get_player_memory(self, player_id: str) -> PlayerMemory:
         """获取玩家的记忆对象
         
         Args:
             player_id: 玩家ID
             
         Returns:
-            ConversationBufferWindowMemory: 玩家的记忆对象
+            PlayerMemory: 玩家的记忆对象
         """
-        if player_id not in self.player_memories:
-            self.player_memories[player_id] = ConversationBufferWindowMemory(
-                k=self.memory_window_size,
-                return_messages=True
-            )
+        return self._slot(player_id)
+    
+    def _slot(self, player_id: str) -> PlayerMemory:
+        """以一次字典查找取得玩家记忆，不存在时创建
         
-        return self.player_memories[player_id]
+        Args:
+            player_id: 玩家ID
+            
+        Returns:
+            PlayerMemory: 玩家的记忆对象
+        """
+        memory = self._lru.get(player_id)
+        if memory is not None:
+            self._lru.move_to_end(player_id)
+            return memory
+        
+        memory = self.player_memories.get(player_id)
+        if memory is None:
+            if self._memory_pool:
+                memory = self._memory_pool.pop()
+                # 记忆窗口可能在对象入池后被调整
+                if memory.messages.maxlen != self.memory_window_size * 2:
+                    memory.messages = deque(maxlen=self.memory_window_size * 2)
+            else:
+                memory = PlayerMemory(messages=deque(maxlen=self.memory_window_size * 2))
+            self.player_memories[player_id] = memory
+        else:
+            # 已被淘汰但仍被外部引用，恢复统计和活跃索引
+            self._total_interactions += memory.interaction_count
+            if memory.last_interaction_time:
+                self._set_activity(player_id, memory.last_interaction_time)
+                self._set_timestamp(player_id, memory.last_interaction_time)
+        
+        self._lru[player_id] = memory
+        if len(self._lru) > self.max_players:
+            evicted_id, evicted = self._lru.popitem(last=False)
+            self._forget(evicted_id, evicted)
+        return memory
+    
+    def _forget(self, player_id: str, memory: PlayerMemory):
+        """从统计和索引中移除玩家记忆
+        
+        Args:
+            player_id: 玩家ID
+            memory: 玩家的记忆对象
+        """
+        self._total_interactions -= memory.interaction_count
+        timestamp = self._recent_players.pop(player_id, None)
+        if timestamp is not None:
+            self._activity_index.remove((timestamp, player_id))
+        
+        index = self._pid_index.pop(player_id, None)
+        if index is not None:
+            self._ts_array[index] = -np.inf
+            self._free_indices.append(index)
+    
+    def _set_timestamp(self, player_id: str, timestamp: float):
+        """在时间戳数组中记录玩家的最后交互时间
+        
+        Args:
+            player_id: 玩家ID
+            timestamp: 最后交互时间
+        """
+        index = self._pid_index.get(player_id)
+        if index is None:
+            if self._free_indices:
+                index = self._free_indices.pop()
+            else:
+                index = len(self._pid_index)
+                if index >= len(self._ts_array):
+                    grown = np.full(len(self._ts_array) * 2, -np.inf, dtype=np.float64)
+                    grown[:index] = self._ts_array[:index]
+                    self._ts_array = grown
+            self._pid_index[player_id] = index
+        self._ts_array[index] = timestamp
+    
+    def _set_activity(self, player_id: str, timestamp: float):
+        """在活跃索引中更新玩家的最后交互时间
+        
+        Args:
+            player_id: 玩家ID
+            timestamp: 最后交互时间
+        """
+        previous = self._recent_players.get(player_id)
+        if previous is not None:
+            self._activity_index.remove((previous, player_id))
+        self._recent_players[player_id] = timestamp
+        self._activity_index.add((timestamp, player_id))
     
 
                     # content={
@@ -67,39 +292,54 @@ class MemoryManager:
         - context: 存储环境和触发条件信息
         - human_input/ai_response: 用于传统对话形式的记录（向后兼容）
         """
-        memory = self.get_player_memory(player_id)
+        # 交互类型只有少数几种，驻留后作为字典键比较更快
+        interaction_type = sys.intern(interaction_type)
+        memory = self._slot(player_id)
         
         # 构建交互记录的描述信息
         if human_input and ai_response:
             # 传统对话模式
-            memory.chat_memory.add_user_message(human_input)
-            memory.chat_memory.add_ai_message(ai_response)
+            memory.messages.append((ROLE_HUMAN, human_input))
+            memory.messages.append((ROLE_AI, ai_response))
         else:
             # 新的结构化交互模式
             interaction_summary = self._build_interaction_summary(interaction_type, content, context)
-            memory.chat_memory.add_user_message(f"触发事件: {interaction_type}")
-            memory.chat_memory.add_ai_message(interaction_summary)
+            memory.messages.append((ROLE_HUMAN, f"触发事件: {interaction_type}"))
+            memory.messages.append((ROLE_AI, interaction_summary))
+        memory.interaction_count += 1
+        self._total_interactions += 1
+        now = time.time()
         
         # 更新上下文
         if context:
-            if player_id not in self.player_contexts:
-                self.player_contexts[player_id] = {}
-            self.player_contexts[player_id].update(context)
+            memory.context.update(context)
 
         # 更新内容数据
         if content:
-            if player_id not in self.player_content:
-                self.player_content[player_id] = {}
             # 按交互类型组织内容
-            if interaction_type not in self.player_content[player_id]:
-                self.player_content[player_id][interaction_type] = []
-            self.player_content[player_id][interaction_type].append({
-                "timestamp": datetime.now().isoformat(),
+            entries = memory.content.get(interaction_type)
+            if entries is None:
+                entries = memory.content[interaction_type] = deque(maxlen=self.max_content_history)
+            # 只记录浮点时间戳，读取时再格式化
+            entries.append({
+                "ts": now,
                 "data": content
             })
         
         # 更新最后交互时间
-        self.last_interaction_time[player_id] = datetime.now()
+        self._touch(player_id, memory, now)
+    
+    def _touch(self, player_id: str, memory: PlayerMemory, timestamp: float):
+        """更新玩家的最后交互时间并同步过期索引
+        
+        Args:
+            player_id: 玩家ID
+            memory: 玩家的记忆对象
+            timestamp: 新的最后交互时间
+        """
+        memory.last_interaction_time = timestamp
+        self._set_activity(player_id, timestamp)
+        self._set_timestamp(player_id, timestamp)
     
     def _build_interaction_summary(self, interaction_type: str, 
                                  content: Optional[Dict[str, Any]], 
@@ -114,38 +354,10 @@ class MemoryManager:
         Returns:
             str: 交互摘要
         """
-        summary_parts = []
-        
-        if interaction_type == "trigger_event_v2":
-            if content and "intervention_analysis" in content:
-                analysis = content["intervention_analysis"]
-                if analysis.get("intervention_needed", False):
-                    summary_parts.append(f"检测到需要干预: {analysis.get('intervention_reason', '未知原因')}")
-                    summary_parts.append(f"建议干预类型: {analysis.get('suggested_intervention_type', '未指定')}")
-                else:
-                    summary_parts.append("分析完成，无需干预")
-                
-                if "player_mood_summary" in analysis:
-                    summary_parts.append(f"玩家情绪: {analysis['player_mood_summary']}")
-            
-            if content and "execution_result" in content:
-                result = content["execution_result"]
-                if result.get("success", False):
-                    summary_parts.append("干预执行成功")
-                else:
-                    summary_parts.append(f"干预执行失败: {result.get('error', '未知错误')}")
-        
-        elif interaction_type == "player_action":
-            if content and "action" in content:
-                action = content["action"]
-                summary_parts.append(f"玩家行为: {action.get('action_type', '未知行为')}")
-        
-        else:
-            summary_parts.append(f"交互类型: {interaction_type}")
-            if content:
-                summary_parts.append(f"包含 {len(content)} 项数据")
-        
-        return " | ".join(summary_parts) if summary_parts else "交互记录"
+        builder = _SUMMARY_BUILDERS.get(interaction_type)
+        if builder is None:
+            return _default_summary(interaction_type, content)
+        return builder(content, context)
     
     def get_conversation_history(self, player_id: str) -> List[BaseMessage]:
         """获取玩家的对话历史
@@ -156,8 +368,11 @@ class MemoryManager:
         Returns:
             List[BaseMessage]: 对话历史消息列表
         """
-        memory = self.get_player_memory(player_id)
-        return memory.chat_memory.messages
+        memory = self._slot(player_id)
+        return [
+            _ROLE_MESSAGE_CLASSES[role](content=text)
+            for role, text in memory.messages
+        ]
     
     def get_player_context(self, player_id: str) -> Dict[str, Any]:
         """获取玩家的上下文信息
@@ -168,7 +383,8 @@ class MemoryManager:
         Returns:
             Dict[str, Any]: 玩家上下文信息
         """
-        return self.player_contexts.get(player_id, {})
+        memory = self.player_memories.get(player_id)
+        return memory.context if memory else {}
     
     def get_player_content(self, player_id: str, interaction_type: Optional[str] = None) -> Dict[str, Any]:
         """获取玩家的内容数据
@@ -178,15 +394,19 @@ class MemoryManager:
             interaction_type: 可选的交互类型过滤器
             
         Returns:
-            Dict[str, Any]: 玩家内容数据
+            Dict[str, Any]: 玩家内容数据；指定交互类型时返回该类型最近的内容列表
         """
-        if player_id not in self.player_content:
+        memory = self.player_memories.get(player_id)
+        if memory is None:
             return {}
         
         if interaction_type:
-            return self.player_content[player_id].get(interaction_type, [])
+            return _format_content_entries(memory.content.get(interaction_type, ()))
         else:
-            return self.player_content[player_id]
+            return {
+                content_type: _format_content_entries(entries)
+                for content_type, entries in memory.content.items()
+            }
     
     def update_player_context(self, player_id: str, context: Dict[str, Any]):
         """更新玩家上下文信息
@@ -195,9 +415,9 @@ class MemoryManager:
             player_id: 玩家ID
             context: 要更新的上下文信息
         """
-        if player_id not in self.player_contexts:
-            self.player_contexts[player_id] = {}
-        self.player_contexts[player_id].update(context)
+        memory = self._slot(player_id)
+        memory.context.update(context)
+        memory.summary_cache = None
     
     def clear_player_memory(self, player_id: str):
         """清除玩家的记忆
@@ -205,79 +425,149 @@ class MemoryManager:
         Args:
             player_id: 玩家ID
         """
-        if player_id in self.player_memories:
-            self.player_memories[player_id].clear()
-        if player_id in self.player_contexts:
-            del self.player_contexts[player_id]
-        if player_id in self.last_interaction_time:
-            del self.last_interaction_time[player_id]
+        memory = self._lru.pop(player_id, None)
+        self.player_memories.pop(player_id, None)
+        if memory is not None:
+            self._forget(player_id, memory)
+            # 重置后放回对象池；LRU淘汰的对象可能仍被外部持有，不回收
+            memory.messages.clear()
+            memory.context = {}
+            memory.content = {}
+            memory.last_interaction_time = 0.0
+            memory.interaction_count = 0
+            memory.summary_cache = None
+            self._memory_pool.append(memory)
     
-    def cleanup_old_memories(self, max_age_hours: int = 24):
+    def cleanup_old_memories(self, max_age_hours: int = 24, now: Optional[float] = None):
         """清理过期的记忆
         
         Args:
             max_age_hours: 最大保留时间（小时）
+            now: 当前时间戳，批量调用时可由调用方统一传入
         """
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        expired_players = []
-        
-        for player_id, last_time in self.last_interaction_time.items():
-            if last_time < cutoff_time:
-                expired_players.append(player_id)
-        
-        for player_id in expired_players:
+        cutoff_time = (time.time() if now is None else now) - max_age_hours * 3600
+        index = self._activity_index
+        
+        # 过期条目集中在索引开头：一次二分定位，整段删除后逐个回收
+        count = index.bisect_key_left(cutoff_time)
+        if not count:
+            return
+        expired = [player_id for _, player_id in index.islice(0, count)]
+        del index[:count]
+        recent_players = self._recent_players
+        for player_id in expired:
+            # 先移出活跃表，清除时不再逐个从索引删除
+            del recent_players[player_id]
             self.clear_player_memory(player_id)
     
-    def get_memory_summary(self, player_id: str) -> str:
+    def get_memory_summary(self, player_id: str, detail_level: Literal["brief", "full"] = "brief") -> str:
         """获取记忆摘要
         
         Args:
             player_id: 玩家ID
+            detail_level: brief 不包含上下文信息；full 额外附带序列化后的上下文
             
         Returns:
             str: 记忆摘要
         """
-        memory = self.get_player_memory(player_id)
-        messages = memory.chat_memory.messages
-        context = self.get_player_context(player_id)
+        memory = self._slot(player_id)
+        messages = memory.messages
         
         if not messages:
             return "无历史交互记录"
         
-        summary = f"与玩家 {player_id} 的交互历史：\n"
-        summary += f"总交互次数: {len(messages) // 2}\n"
+        cached = memory.summary_cache
+        if cached is not None and cached[0] == memory.last_interaction_time and cached[1] == detail_level:
+            return cached[2]
         
-        if player_id in self.last_interaction_time:
-            last_time = self.last_interaction_time[player_id]
-            summary += f"最后交互时间: {last_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        lines = [
+            f"与玩家 {player_id} 的交互历史：",
+            f"总交互次数: {memory.interaction_count}"
+        ]
         
-        if context:
-            summary += f"上下文信息: {json.dumps(context, ensure_ascii=False, indent=2)}\n"
+        if memory.last_interaction_time:
+            last_time = datetime.fromtimestamp(memory.last_interaction_time)
+            lines.append(f"最后交互时间: {last_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # 上下文只在需要完整摘要时才序列化
+        if detail_level == "full" and memory.context:
+            lines.append(f"上下文信息: {self._format_context(memory.context)}")
         
         # 显示最近的几条消息
-        recent_messages = messages[-4:] if len(messages) >= 4 else messages
-        summary += "\n最近的对话:\n"
-        for i, msg in enumerate(recent_messages):
-            role = "用户" if isinstance(msg, HumanMessage) else "AI"
-            summary += f"{role}: {msg.content[:100]}...\n"
+        lines.append("")
+        lines.append("最近的对话:")
+        lines.extend(
+            f"{_ROLE_DISPLAY_NAMES[role]}: {text[:100]}..."
+            for role, text in islice(messages, max(len(messages) - 4, 0), None)
+        )
+        lines.append("")
         
+        summary = "\n".join(lines)
+        memory.summary_cache = (memory.last_interaction_time, detail_level, summary)
         return summary
     
-    def has_recent_interaction(self, player_id: str, hours: int = 1) -> bool:
+    @staticmethod
+    def _format_context(context: Dict[str, Any]) -> str:
+        """将上下文格式化为截断后的JSON字符串（优先使用orjson）
+        
+        Args:
+            context: 玩家上下文信息
+            
+        Returns:
+            str: 最多 SUMMARY_CONTEXT_LIMIT 个字符的JSON文本
+        """
+        if orjson is not None:
+            text = orjson.dumps(
+                context,
+                default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        else:
+            text = json.dumps(context, ensure_ascii=False, indent=2, default=str)
+        return text[:SUMMARY_CONTEXT_LIMIT]
+    
+    def has_recent_interaction(self, player_id: str, hours: int = 1, now: Optional[float] = None) -> bool:
         """检查是否有最近的交互
         
         Args:
             player_id: 玩家ID
             hours: 时间范围（小时）
+            now: 当前时间戳，批量调用时可由调用方统一传入
             
         Returns:
             bool: 是否有最近交互
         """
-        if player_id not in self.last_interaction_time:
+        index = self._pid_index.get(player_id)
+        if index is None:
             return False
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        return self.last_interaction_time[player_id] > cutoff_time
+        return bool(self._ts_array[index] > (time.time() if now is None else now) - hours * 3600)
+    
+    def bulk_has_recent_interaction(self, 
+                                    player_ids: List[str], 
+                                    hours: int = 1,
+                                    now: Optional[float] = None) -> np.ndarray:
+        """批量检查玩家是否有最近的交互
+        
+        Args:
+            player_ids: 玩家ID列表
+            hours: 时间范围（小时）
+            now: 当前时间戳，批量调用时可由调用方统一传入
+            
+        Returns:
+            np.ndarray: 与 player_ids 对应的布尔数组
+        """
+        cutoff_time = (time.time() if now is None else now) - hours * 3600
+        pid_index = self._pid_index
+        indices = np.fromiter(
+            (pid_index.get(player_id, -1) for player_id in player_ids),
+            dtype=np.intp,
+            count=len(player_ids)
+        )
+        known = indices >= 0
+        result = np.zeros(len(indices), dtype=np.bool_)
+        result[known] = self._ts_array[indices[known]] > cutoff_time
+        return result
     
     def get_interaction_count(self, player_id: str) -> int:
         """获取交互次数
@@ -288,8 +578,31 @@ class MemoryManager:
         Returns:
             int: 交互次数
         """
-        memory = self.get_player_memory(player_id)
-        return len(memory.chat_memory.messages) // 2
+        # 计数随 add_interaction 维护；直接查强引用表，省去弱引用解引用
+        memory = self._lru.get(player_id)
+        return memory.interaction_count if memory is not None else 0
+    
+    def export_memory_metadata(self, player_id: str) -> Dict[str, Any]:
+        """导出记忆中除消息以外的数据
+        
+        Args:
+            player_id: 玩家ID
+            
+        Returns:
+            Dict[str, Any]: 玩家ID、上下文、最后交互时间和交互次数
+        """
+        return _export_metadata(player_id, self._slot(player_id))
+    
+    def iter_export_messages(self, player_id: str) -> Iterator[Dict[str, Any]]:
+        """逐条导出玩家的消息，不生成中间列表
+        
+        Args:
+            player_id: 玩家ID
+            
+        Returns:
+            Iterator[Dict[str, Any]]: 消息字典迭代器
+        """
+        return _export_messages(self._slot(player_id).messages)
     
     def export_memory_data(self, player_id: str) -> Dict[str, Any]:
         """导出记忆数据
@@ -300,24 +613,24 @@ class MemoryManager:
         Returns:
             Dict[str, Any]: 记忆数据
         """
-        memory = self.get_player_memory(player_id)
-        messages = memory.chat_memory.messages
-        context = self.get_player_context(player_id)
-        
-        return {
-            "player_id": player_id,
-            "messages": [
-                {
-                    "type": "human" if isinstance(msg, HumanMessage) else "ai",
-                    "content": msg.content,
-                    "timestamp": getattr(msg, 'timestamp', None)
-                }
-                for msg in messages
-            ],
-            "context": context,
-            "last_interaction_time": self.last_interaction_time.get(player_id),
-            "interaction_count": len(messages) // 2
-        }
+        memory = self._slot(player_id)
+        data = _export_metadata(player_id, memory)
+        data["messages"] = list(_export_messages(memory.messages))
+        return data
+    
+    def export_memory_json(self, player_id: str) -> bytes:
+        """把记忆数据序列化为JSON（优先使用orjson）
+        
+        Args:
+            player_id: 玩家ID
+            
+        Returns:
+            bytes: UTF-8编码的JSON
+        """
+        data = self.export_memory_data(player_id)
+        if orjson is not None:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
     
     def import_memory_data(self, data: Dict[str, Any]):
         """导入记忆数据
@@ -326,43 +639,49 @@ class MemoryManager:
             data: 记忆数据
         """
         player_id = data["player_id"]
-        memory = self.get_player_memory(player_id)
+        memory = self._slot(player_id)
         
         # 清除现有记忆
-        memory.clear()
+        memory.messages.clear()
+        memory.summary_cache = None
         
         # 导入消息
         for msg_data in data["messages"]:
-            if msg_data["type"] == "human":
-                memory.chat_memory.add_user_message(msg_data["content"])
-            else:
-                memory.chat_memory.add_ai_message(msg_data["content"])
+            role = ROLE_HUMAN if msg_data["type"] == "human" else ROLE_AI
+            memory.messages.append((role, msg_data["content"]))
+        interaction_count = data.get("interaction_count", len(data["messages"]) // 2)
+        self._total_interactions += interaction_count - memory.interaction_count
+        memory.interaction_count = interaction_count
         
         # 导入上下文
         if "context" in data and data["context"]:
-            self.player_contexts[player_id] = data["context"]
+            memory.context = data["context"]
         
         # 导入最后交互时间
-        if "last_interaction_time" in data and data["last_interaction_time"]:
-            self.last_interaction_time[player_id] = data["last_interaction_time"]
+        last_time = data.get("last_interaction_time")
+        if last_time:
+            self._touch(
+                player_id,
+                memory,
+                last_time.timestamp() if isinstance(last_time, datetime) else float(last_time)
+            )
     
-    def get_all_active_players(self, hours: int = 24) -> List[str]:
+    def get_all_active_players(self, hours: int = 24, now: Optional[float] = None) -> List[str]:
         """获取所有活跃玩家ID
         
         Args:
             hours: 活跃时间范围（小时）
+            now: 当前时间戳，批量调用时可由调用方统一传入
             
         Returns:
             List[str]: 活跃玩家ID列表
         """
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        active_players = []
+        cutoff_time = (time.time() if now is None else now) - hours * 3600
+        index = self._activity_index
         
-        for player_id, last_time in self.last_interaction_time.items():
-            if last_time > cutoff_time:
-                active_players.append(player_id)
-        
-        return active_players
+        # 二分找到窗口起点，从最新的交互往回取
+        start = index.bisect_key_right(cutoff_time)
+        return [player_id for _, player_id in index.islice(start, reverse=True)]
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """获取记忆统计信息
@@ -370,19 +689,27 @@ class MemoryManager:
         Returns:
             Dict[str, Any]: 统计信息
         """
-        total_players = len(self.player_memories)
-        total_interactions = sum(
-            len(memory.chat_memory.messages) // 2 
-            for memory in self.player_memories.values()
-        )
-        
-        active_players_1h = len(self.get_all_active_players(1))
-        active_players_24h = len(self.get_all_active_players(24))
-        
-        return {
+        total_players = len(self._lru)
+        total_interactions = self._total_interactions
+        now = time.time()
+        
+        # 只有活跃窗口会随时间变化，短时间内重复查询直接返回缓存
+        cached = self._stats_cache
+        if (cached is not None and now - cached[0] < STATS_CACHE_TTL
+                and cached[1] == total_players and cached[2] == total_interactions):
+            return dict(cached[3])
+        
+        # 两个时间窗口各做一次二分
+        index = self._activity_index
+        active_players_1h = len(index) - index.bisect_key_right(now - 3600)
+        active_players_24h = len(index) - index.bisect_key_right(now - 24 * 3600)
+        
+        stats = {
             "total_players_with_memory": total_players,
             "total_interactions": total_interactions,
             "active_players_last_1h": active_players_1h,
             "active_players_last_24h": active_players_24h,
             "average_interactions_per_player": total_interactions / total_players if total_players > 0 else 0
-        }
\ No newline at end of file
+        }
+        self._stats_cache = (now, total_players, total_interactions, stats)
+        return dict(stats)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Hashable, Optional
+from collections import OrderedDict
+import logging
+
+
+class AgentResponseCache:
+    """按干预决策字段精确匹配的Agent响应缓存
+
+    键由玩家ID、干预类型、干预原因和情绪摘要组成，只有决策完全相同时才命中；
+    缓存的响应只用于复用无副作用的工具输出（如生成的安抚文案），
+    邮件等投递类工具在命中时仍由调用方重新执行
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """初始化响应缓存
+
+        Args:
+            max_entries: 最多保存的条目数，超出时按LRU淘汰最久未使用的条目
+        """
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+        # 决策键 -> Agent响应，按最近使用排序
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def lookup(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """查找决策键对应的缓存响应
+
+        Args:
+            key: 决策键
+
+        Returns:
+            Optional[Dict[str, Any]]: 命中时返回缓存的响应，否则为None
+        """
+        response = self._entries.get(key)
+        if response is None:
+            self.miss_count += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hit_count += 1
+        self.logger.debug(f"响应缓存命中: {key}")
+        return response
+
+    def store(self, key: Hashable, response: Dict[str, Any]):
+        """保存决策键对应的响应
+
+        Args:
+            key: 决策键
+            response: Agent响应
+        """
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计
+
+        Returns:
+            Dict[str, Any]: 条目数和命中情况
+        """
+        total = self.hit_count + self.miss_count
+        return {
+            "entries": len(self._entries),
+            "hits": self.hit_count,
+            "misses": self.miss_count,
+            "hit_rate": self.hit_count / total if total > 0 else 0.0
+        }
@@ -1,13 +1,24 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from langchain.agents import AgentExecutor, create_react_agent
-from langchain.prompts import PromptTemplate
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import BaseTool
+from langchain_core.tools import render_text_description
 from langchain.schema import AgentAction, AgentFinish
 from langchain_openai import ChatOpenAI
+import asyncio
+import hashlib
 import json
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
 import logging
+import queue
+import threading
 from datetime import datetime
-import traceback
 
 from src.tools import (
     GetPlayerStatusTool,
@@ -22,8 +33,254 @@ from src.tools.churn_risk_analysis_tool import ChurnRiskAnalysisTool
 from src.llm.llm_client import LLMClient
 from src.data.data_manager import DataManager
 from .memory_manager import MemoryManager
+from .response_cache import AgentResponseCache
 from src.config.settings import Settings
-import traceback
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# 安全相关的触发条件，其干预响应不走响应缓存
+UNCACHEABLE_TRIGGER_CONDITIONS = frozenset({"机器人检测触发", "流失风险触发"})
+
+# 有外部副作用的投递类工具，响应缓存命中时仍按缓存的调用参数重新执行
+DELIVERY_TOOL_NAMES = frozenset({"send_in_game_mail"})
+
+# ReAct提示模板，模块加载时构建一次，所有智能体实例共用
+# 静态说明和工具描述放在system消息里，每次调用都相同，可以命中服务端的提示前缀缓存；
+# 对话历史和本次输入放在后面的独立消息中
+REACT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+你是一个智能的游戏AI助手，专门负责识别和帮助遇到困难的玩家。
+
+你的核心任务是：
+1. 分析玩家的行为模式和情绪状态
+2. 识别需要干预的关键时刻
+3. 提供个性化的安抚和帮助
+4. 发送合适的奖励和建议
+
+你有以下工具可以使用：
+{tools}
+
+使用以下格式进行思考和行动：
+
+Question: 需要处理的问题或情况
+Thought: 我需要思考如何处理这个情况
+Action: 要使用的工具名称，必须是以下工具之一 [{tool_names}]
+Action Input: 严格遵循对应工具的要求的JSON格式。只有要求的输入参数，没有其他参数。必须是一个**单行**、**无换行**、**无注释**的有效JSON字符串。所有的键（keys）和字符串值（string values）都必须使用双引号（"）包裹。
+
+
+
+重要原则：
+- 始终以玩家体验为中心
+- 提供有同理心和个性化的帮助
+- 根据玩家价值和情况调整干预强度
+- 避免过度干预，保持游戏的自然流畅性
+- 记录所有重要的交互和决策
+
+开始！
+"""),
+    MessagesPlaceholder("chat_history", optional=True),
+    ("human", "Question: {input}\nThought: {agent_scratchpad}")
+])
+
+# 执行阶段的系统提示词
+EXECUTION_SYSTEM_PROMPT = """你是一个智能游戏干预执行助手。你的任务是根据分析结果执行具体的干预动作。
+
+执行原则：
+1. 严格按照干预类型选择合适的工具
+2. 确保干预内容个性化且有针对性
+3. 记录所有执行步骤和结果
+4. 如果执行失败，提供详细的错误信息
+
+可用工具说明：
+- GenerateSoothingMessageTool: 生成安慰消息
+- SendInGameMailTool: 发送游戏内邮件
+- UpdatePlayerStatusTool: 更新玩家状态
+- LogInteractionTool: 记录交互日志
+
+请根据用户提供的干预计划，选择合适的工具并执行。"""
+
+# 执行指令模板，模块加载时构建一次，每次调用只做一次 format
+INSTRUCTION_PREFIX_TEMPLATE = """请执行以下干预计划：
+
+干预类型：{intervention_type}
+干预原因：{intervention_reason}
+玩家情绪状态：{player_mood_summary}
+
+执行要求：
+1. 根据干预类型选择合适的工具执行干预
+2. 确保干预内容符合玩家当前情绪状态
+3. 记录执行过程和结果
+
+可用的干预类型说明：
+- comfort: 使用GenerateSoothingMessageTool发送安慰消息
+- reward: 使用SendInGameMailTool发送奖励邮件
+- guidance: 使用SendInGameMailTool发送引导建议
+- proactive_offer: 使用SendInGameMailTool发送主动关怀
+"""
+
+EXECUTION_INSTRUCTION_TEMPLATE = """{prefix}
+上下文信息：
+{context}
+
+关键分析数据：
+{key_analysis_data}
+
+请立即执行相应的干预动作。"""
+
+# 深度分析任务：(结果键, 工具类, 名称, 工具参数)，按情绪分析优先的顺序排列
+DEEP_ANALYSIS_TASKS = (
+    ("emotion_analysis", EmotionAnalysisTool, "情绪分析", {"analysis_depth": "standard"}),
+    ("bot_detection", BotDetectionTool, "机器人检测", {"time_window_hours": 24}),
+    ("churn_risk_analysis", ChurnRiskAnalysisTool, "流失风险分析", {"time_window_days": 30})
+)
+
+# 机器人检测先单独执行，判定不是机器人后才并发执行其余分析
+BOT_DETECTION_TASK = next(task for task in DEEP_ANALYSIS_TASKS if task[0] == "bot_detection")
+FOLLOW_UP_ANALYSIS_TASKS = tuple(task for task in DEEP_ANALYSIS_TASKS if task[0] != "bot_detection")
+
+# 提示词中嵌入完整行为数据的分析工具，直接使用预先序列化好的 behavior_data_json
+BEHAVIOR_JSON_TOOLS = frozenset({EmotionAnalysisTool})
+
+# 规则预筛选使用的玩家特征，一次 attrgetter 调用读出
+PRESCREEN_FEATURE_NAMES = ("frustration_level", "consecutive_failures", "vip_level", "total_spent")
+_prescreen_features = attrgetter(*PRESCREEN_FEATURE_NAMES)
+
+# 规则预筛选表，按优先级排列：(判定函数(挫折, 连败, VIP, 消费), 原因模板, 建议干预类型, 写入上下文的特征)
+PRESCREEN_RULES = (
+    (lambda frustration, failures, vip, spent: frustration > 5,
+     "玩家挫折等级过高 ({frustration_level})，需要安慰干预",
+     "comfort", ("frustration_level",)),
+    (lambda frustration, failures, vip, spent: failures >= 3,
+     "玩家连续失败次数过多 ({consecutive_failures})，需要引导干预",
+     "guidance", ("consecutive_failures",)),
+    (lambda frustration, failures, vip, spent: vip >= 5 and spent > 1000,
+     "高价值VIP玩家 (VIP{vip_level}, 消费${total_spent})，需要主动关怀",
+     "proactive_offer", ("vip_level", "total_spent")),
+)
+
+# 触发动作为这些类型时需要深度情绪分析
+FAILURE_ACTION_TYPES = frozenset({"battle_failure", "card_draw_failure"})
+
+# 需要主动挽留的流失风险等级
+HIGH_CHURN_RISK_LEVELS = frozenset({"high", "critical"})
+
+# 决策原因模板，只需填入动态字段
+FAILURE_ACTION_REASON_TEMPLATE = "检测到失败类型动作 ({action_type})，需要深度情绪分析"
+COMFORT_REASON_TEMPLATE = "玩家表现出多种负面情绪 ({emotions})，结合{rule_reason}，需要安慰干预"
+REWARD_REASON_TEMPLATE = "玩家表现出积极情绪 ({emotions})，适合给予奖励干预"
+CHURN_REASON_TEMPLATE = "检测到{risk_level}流失风险"
+
+# 机器人概率超过该值时不再做情绪和流失分析，直接判定无需干预
+BOT_PROBABILITY_THRESHOLD = 0.8
+
+# 无需干预时返回结果的固定部分
+NO_INTERVENTION_RESULT = {
+    "success": True,
+    "intervention_needed": False,
+    "method": "no_intervention"
+}
+
+# 触发事件微批处理的时间窗口（秒）和单批上限
+TRIGGER_BATCH_WINDOW_SECONDS = 0.05
+TRIGGER_BATCH_MAX_SIZE = 16
+
+# 安抚消息只有50-100字，生成时限制在较小的token预算内
+SOOTHING_MAX_TOKENS = 512
+
+# 交互记录写入队列的容量，队列满时退回同步写入
+MEMORY_QUEUE_SIZE = 10000
+
+# 规则引擎：行为模式 -> 关怀消息
+RULE_PATTERN_MESSAGES = {
+    "high_frustration": "亲爱的玩家，我们注意到您最近遇到了一些挑战。请不要气馁，每个强者都会经历挫折。我们为您准备了一些资源来帮助您重新出发！",
+    "seeking_help": "我们看到您在寻求帮助，这很棒！我们为您准备了一些实用的建议和资源。记住，团队合作是成功的关键！",
+    "default": "感谢您对游戏的热情！我们为您准备了一些小礼物，希望能让您的游戏体验更加愉快。"
+}
+
+# 规则引擎：玩家价值档位 -> (优先级, 奖励)
+RULE_TIER_PLANS = {
+    "high": ("high", ("gold:1000", "gem:50")),
+    "medium": ("medium", ("gold:500", "gem:20")),
+    "low": ("normal", ("gold:200", "gem:5"))
+}
+
+# 连续失败时追加到消息末尾的说明
+RULE_FAILURE_SUPPLEMENT = "\n\n另外，我们为您提供了装备强化石，帮助您提升实力！"
+
+# 近期活跃度的占位数据，尚未接入实际数据源
+RECENT_ACTIVITY_PLACEHOLDER = {
+    "login_frequency": "daily",
+    "session_duration": "2-3 hours",
+    "task_completion_rate": 0.75,
+    "social_interactions": 5,
+    "purchase_behavior": "occasional"
+}
+
+# 格式化后的工具描述以此开头
+TOOL_DESCRIPTION_PREFIX = "工具名称: "
+
+
+@lru_cache(maxsize=None)
+def _format_tool_description(name: str, description: str) -> str:
+    """生成供Prompt使用的工具描述，同一工具的结果在多个智能体实例间复用"""
+    return f"{TOOL_DESCRIPTION_PREFIX}{name}\n工具描述: {description}"
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON序列化的兜底转换：pydantic 模型（如 PlayerAction）转为字典，其余转为字符串"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+
+def _dumps_indented(obj: Any) -> str:
+    """序列化为缩进2格、保留中文的JSON文本（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default)
+
+
+@lru_cache(maxsize=256)
+def _join_emotions(emotions: Tuple[str, ...]) -> str:
+    """拼接情绪列表，常见的情绪组合直接复用拼接结果"""
+    return ", ".join(emotions)
+
+
+@lru_cache(maxsize=1024)
+def _dumps_flat_context(items: Tuple[Tuple[str, Any], ...]) -> str:
+    """按 (键, 值) 元组缓存扁平上下文的序列化结果"""
+    return _dumps_indented(dict(items))
+
+
+@dataclass(slots=True)
+class BehaviorData:
+    """深度分析工具使用的行为数据"""
+    player_basic_info: Dict[str, Any]
+    trigger_info: Dict[str, Any]
+    recent_activity: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为分析工具接受的字典，子字典不复制"""
+        return {
+            "player_basic_info": self.player_basic_info,
+            "trigger_info": self.trigger_info,
+            "recent_activity": self.recent_activity
+        }
+
+
+def _trigger_field(trigger_context: Any, name: str, default: Any = None) -> Any:
+    """从触发上下文中取字段，兼容字典和 TriggerEvent 对象"""
+    if isinstance(trigger_context, dict):
+        return trigger_context.get(name, default)
+    return getattr(trigger_context, name, default)
 
 
 class SmartGameAgent:
@@ -32,6 +289,11 @@ class SmartGameAgent:
     基于ReAct架构的智能体，能够分析玩家行为并提供个性化干预
     """
     
+    # (LLM, 数据管理器, 工具名, 最大迭代次数) -> (LLM, 数据管理器, Agent执行器)
+    # 同配置的智能体共用一个执行器；值里持有 LLM 和数据管理器，保证键中的 id 不会被复用
+    _EXECUTOR_CACHE: Dict[Tuple, Tuple[Any, Any, AgentExecutor]] = {}
+    _EXECUTOR_CACHE_LOCK = threading.Lock()
+    
     def __init__(self, 
                  data_manager: DataManager,
                  settings: Optional[Settings] = None,
@@ -47,13 +309,23 @@ class SmartGameAgent:
         self.settings = settings or Settings()
         self.logger = logging.getLogger(__name__)
         
+        # ChatOpenAI 和 LLMClient 访问同一个模型服务，共用一个连接池复用 TCP/TLS 连接
+        self._http_client = None
+        if httpx is not None:
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.settings.model_max_connections,
+                    max_keepalive_connections=self.settings.model_max_connections
+                ),
+                timeout=self.settings.model_timeout
+            )
+        
         # 初始化LLM
         if llm:
             self.llm = llm
         else:
             try:
                 if self.settings.model_provider == "volces":
-                    # print("model_provider:",self.settings.model_provider)
                     self.llm = ChatOpenAI(
                         model=self.settings.model_name,
                         base_url=self.settings.model_base_url,
@@ -61,16 +333,18 @@ class SmartGameAgent:
                         temperature=0.3,
                         max_tokens=3000,
                         timeout=self.settings.model_timeout,
-                        max_retries=self.settings.model_retry_count
+                        max_retries=self.settings.model_retry_count,
+                        http_client=self._http_client
                     )
-                    print("LLM 初始化完成")
+                    self.logger.debug("LLM 初始化完成")
                 else:
                     # 默认使用OpenAI配置
                     self.llm = ChatOpenAI(
                         model=self.settings.openai_model,
                         api_key=self.settings.openai_api_key,
                         temperature=0.3,
-                        max_tokens=1000
+                        max_tokens=1000,
+                        http_client=self._http_client
                     )
                 
             except Exception as e:
@@ -87,7 +361,8 @@ class SmartGameAgent:
                     base_url=self.settings.model_base_url if self.settings.model_provider == "volces" else None,
                     timeout=self.settings.model_timeout,
                     max_retries=self.settings.model_retry_count,
-                    provider=self.settings.model_provider
+                    provider=self.settings.model_provider,
+                    http_client=self._http_client
                 )
                 self.logger.info("LLM客户端初始化完成")
             except Exception as e:
@@ -96,17 +371,59 @@ class SmartGameAgent:
         
         # 初始化记忆管理器
         self.memory_manager = MemoryManager(
-            memory_window_size=self.settings.agent_memory_window
+            memory_window_size=self.settings.agent_memory_window,
+            max_players=self.settings.agent_max_players
         )
         
+        # 交互记录由后台线程写入记忆管理器，事件处理线程只负责入队
+        # 记忆管理器本身不是线程安全的，所有访问都要持有 _memory_lock
+        self._memory_lock = threading.Lock()
+        self._memory_queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=MEMORY_QUEUE_SIZE)
+        self._memory_writer = threading.Thread(
+            target=self._drain_memory_queue, name="memory-writer", daemon=True
+        )
+        self._memory_writer.start()
+        
         # 初始化工具
-        print("初始化工具")
+        self.logger.debug("初始化工具")
         self.tools = self._initialize_tools()
+        # 工具描述和工具名在实例生命周期内不变，预先渲染好供ReAct提示使用
+        self._tools_str = render_text_description(self.tools)
+        # 工具名 -> 工具实例，按名称取工具时直接查表
+        self._tools_by_name: Dict[str, BaseTool] = {tool.name: tool for tool in self.tools}
+        # 工具类 -> 工具实例，深度分析直接复用这些实例，不再按玩家重复构造
+        self._analysis_tools: Dict[type, BaseTool] = {type(tool): tool for tool in self.tools}
+        self._tool_names_str = ", ".join(self._tools_by_name)
         
         # 初始化Agent
-        print("初始化Agent")
+        self.logger.debug("初始化Agent")
+        self._base_prompt: Optional[ChatPromptTemplate] = None
         self.agent_executor = self._create_agent_executor()
         
+        # 深度分析的三个工具并发执行；异步路径下多个事件的分析同时提交，
+        # 线程数与HTTP连接池上限一致（线程按需创建）
+        self._analysis_executor = ThreadPoolExecutor(
+            max_workers=max(len(DEEP_ANALYSIS_TASKS), self.settings.model_max_connections),
+            thread_name_prefix="deep-analysis"
+        )
+        
+        # 深度分析结果缓存：(玩家ID, 行为数据摘要) -> (过期时间, 分析结果)，按LRU淘汰
+        # 同一键正在分析时，后来的调用等待进行中的 Future，不重复调用LLM
+        self._analysis_cache: "OrderedDict[Tuple[str, bytes], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._analysis_inflight: Dict[Tuple[str, bytes], Future] = {}
+        self._analysis_cache_lock = threading.Lock()
+        
+        # 执行指令前缀缓存：(玩家ID, 干预类型, 干预原因, 情绪摘要) -> 指令前缀
+        self._prefix_cache: Dict[Tuple[str, str, str, str], str] = {}
+        
+        # 微批处理：等待合并的 (玩家ID, 触发上下文, 结果Future) 及窗口定时器
+        self._pending_events: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._batch_flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: set = set()
+        
+        # Agent响应缓存：同一玩家的干预决策完全相同时复用上次的工具输出，投递类工具仍重新执行
+        self.response_cache = AgentResponseCache(max_entries=self.settings.response_cache_size)
+        
         # 统计信息
         self.intervention_count = 0
         self.success_count = 0
@@ -120,7 +437,6 @@ class SmartGameAgent:
         Returns:
             List[BaseTool]: 工具列表
         """
-        # print("self.data_manager",self.data_manager)
         # soothing_tool = GenerateSoothingMessageTool()
         
         # 2. 将 llm 实例作为属性手动赋值给它
@@ -130,14 +446,13 @@ class SmartGameAgent:
             GetPlayerStatusTool(data_manager=self.data_manager),
             GetPlayerActionHistoryTool(data_manager=self.data_manager),
             SendInGameMailTool(data_manager=self.data_manager),
-            GenerateSoothingMessageTool(llm=self.llm,data_manager=self.data_manager),
+            GenerateSoothingMessageTool(llm=self._soothing_llm(), data_manager=self.data_manager),
             AnalyzePlayerBehaviorTool(data_manager=self.data_manager)
         ]
         
         # 添加新的分析工具（如果LLM客户端可用）
         if self.llm_client:
             try:
-                # print("self.data_manager.player_manager:",getattr(self.data_manager, 'player_manager', None))
                 # 情绪分析工具
                 emotion_tool = EmotionAnalysisTool(
                     llm_client=self.llm_client,
@@ -165,24 +480,27 @@ class SmartGameAgent:
         else:
             self.logger.warning("LLM客户端不可用，跳过新分析工具的初始化")
         
-        # <--- MODIFICATION START --- >
-        # 在返回工具列表之前，遍历并格式化每个工具的描述
+        # 在返回工具列表之前，格式化每个工具的描述；已格式化过的描述不再重复包装
         for tool in tools:
-            # 保存原始描述
-            original_description = tool.description
-            # 创建新的、格式化的描述字符串
-            formatted_description = (
-                f"工具名称: {tool.name}\n"
-                f"工具描述: {original_description}"
-            )
-            # 用新的描述覆盖实例的 description 属性
-            tool.description = formatted_description
-        # <--- MODIFICATION END --- >
+            if not tool.description.startswith(TOOL_DESCRIPTION_PREFIX):
+                tool.description = _format_tool_description(tool.name, tool.description)
 
         self.logger.info(f"初始化了 {len(tools)} 个工具，并格式化了描述以供Prompt使用")
         return tools
     
 
+    def _soothing_llm(self):
+        """获取生成安抚消息用的LLM
+        
+        与ReAct Agent共用同一个模型实例，只把单次生成的 max_tokens 降到 SOOTHING_MAX_TOKENS
+        
+        Returns:
+            安抚消息工具使用的Runnable，没有LLM时为None
+        """
+        if isinstance(self.llm, ChatOpenAI):
+            return self.llm.bind(max_tokens=SOOTHING_MAX_TOKENS)
+        return self.llm
+    
     def _create_agent_executor(self) -> Optional[AgentExecutor]:
         """创建Agent执行器
         
@@ -193,96 +511,32 @@ class SmartGameAgent:
             self.logger.warning("没有可用的LLM，Agent将在模拟模式下运行")
             return None
         
-        # 定义ReAct提示模板
-        from langchain.prompts import PromptTemplate
-        react_prompt = PromptTemplate.from_template(
-#     """
-# 你是一个智能的游戏AI助手，专门负责识别和帮助遇到困难的玩家。
-
-# 你的核心任务是：
-# 1. 分析玩家的行为模式和情绪状态
-# 2. 识别需要干预的关键时刻
-# 3. 提供个性化的安抚和帮助
-# 4. 发送合适的奖励和建议
-
-# 你有以下工具可以使用：
-# {tools}
-
-# 使用以下格式进行思考和行动：
-
-# Question: 需要处理的问题或情况
-# Thought: 我需要思考如何处理这个情况
-# Action: 要使用的工具名称，必须是以下工具之一 [{tool_names}]
-# Action Input: 工具的输入JSON格式参数，参数必须是一个JSON字符串
-# Observation: 工具执行的结果
-# ... (这个思考/行动/观察的过程可以重复多次)
-# Thought: 我现在知道最终答案了
-# Final Answer: 最终的处理结果和建议
-
-# 重要原则：
-# - 始终以玩家体验为中心
-# - 提供有同理心和个性化的帮助
-# - 根据玩家价值和情况调整干预强度
-# - 避免过度干预，保持游戏的自然流畅性
-# - 记录所有重要的交互和决策
-
-# 开始！
-
-# Question: {input}
-# Thought: {agent_scratchpad}
-
-#     """
-# )
-# Observation: 工具执行的结果
-# ... (这个思考/行动/观察的过程可以重复多次)
-# Thought: 我现在知道最终答案了
-# Final Answer: 最终的处理结果和建议
-    """
-你是一个智能的游戏AI助手，专门负责识别和帮助遇到困难的玩家。
-
-你的核心任务是：
-1. 分析玩家的行为模式和情绪状态
-2. 识别需要干预的关键时刻
-3. 提供个性化的安抚和帮助
-4. 发送合适的奖励和建议
-
-你有以下工具可以使用：
-{tools}
-
-使用以下格式进行思考和行动：
-
-Question: 需要处理的问题或情况
-Thought: 我需要思考如何处理这个情况
-Action: 要使用的工具名称，必须是以下工具之一 [{tool_names}]
-Action Input: 严格遵循对应工具的要求的JSON格式。只有要求的输入参数，没有其他参数。必须是一个**单行**、**无换行**、**无注释**的有效JSON字符串。所有的键（keys）和字符串值（string values）都必须使用双引号（"）包裹。
-
-
-
-重要原则：
-- 始终以玩家体验为中心
-- 提供有同理心和个性化的帮助
-- 根据玩家价值和情况调整干预强度
-- 避免过度干预，保持游戏的自然流畅性
-- 记录所有重要的交互和决策
-
-开始！
-
-Question: {input}
-Thought: {agent_scratchpad}
-"""
-)
-
-
-
+        # 工具实例绑定了数据管理器，因此数据管理器也是缓存键的一部分
+        cache_key = (
+            id(self.llm),
+            id(self.data_manager),
+            tuple(sorted(self._tools_by_name)),
+            self.settings.agent_max_iterations
+        )
         
         try:
             # 创建ReAct Agent
-            tool_names = [tool.__class__.__name__ for tool in self.tools]
-            # 框架会自动将 "generate_soothing_message, send_reward_tool" 这个字符串填充到提示词中 {tool_names} 的位置。
+            # 工具描述和工具名预先填入共用模板，之后每步只需渲染 input 和 agent_scratchpad
+            self._base_prompt = REACT_PROMPT.partial(
+                tools=self._tools_str,
+                tool_names=self._tool_names_str
+            )
+            
+            with self._EXECUTOR_CACHE_LOCK:
+                cached = self._EXECUTOR_CACHE.get(cache_key)
+            if cached is not None:
+                self.logger.info("复用已创建的ReAct Agent执行器")
+                return cached[2]
+            
             agent = create_react_agent(
                 llm=self.llm,
                 tools=self.tools,
-                prompt=react_prompt
+                prompt=self._base_prompt
             )
             
             # 创建Agent执行器
@@ -295,13 +549,17 @@ Thought: {agent_scratchpad}
                 return_intermediate_steps=True
             )
             
+            with self._EXECUTOR_CACHE_LOCK:
+                # 并发创建时以先写入的执行器为准
+                cached = self._EXECUTOR_CACHE.setdefault(
+                    cache_key, (self.llm, self.data_manager, agent_executor)
+                )
+            
             self.logger.info("成功创建ReAct Agent执行器")
-            return agent_executor
+            return cached[2]
             
         except Exception as e:
-            self.logger.error(f"创建Agent执行器失败: {e}")
-            error_details = traceback.format_exc()
-            print(error_details)
+            self.logger.exception(f"创建Agent执行器失败: {e}")
             return None
     
     def process_trigger_event(self, 
@@ -320,48 +578,66 @@ Thought: {agent_scratchpad}
         start_time = datetime.now()
         
         self.logger.info(f"开始处理玩家 {player_id} 的触发事件")
-        import traceback
         try:
             # 执行统一的分析和准备流程
-            intervention_analysis = self._analyze_and_prepare_intervention(player_id, trigger_context)
-            print("intervention_analysis:", intervention_analysis)
-            
-            # 添加玩家ID到上下文中，供规则引擎使用
-            intervention_analysis["context"]["player_id"] = player_id
+            intervention_analysis = self._prepare_trigger_event(player_id, trigger_context)
+            if not intervention_analysis["intervention_needed"]:
+                return self._finish_without_intervention(player_id, intervention_analysis, start_time)
             
             if self.agent_executor:
                 # 使用LLM Agent执行干预
-                result = self._process_with_llm_agent(intervention_analysis)
+                result = self._process_with_llm_agent(
+                    intervention_analysis,
+                    cacheable=self._is_cacheable_trigger(trigger_context)
+                )
             else:
                 # 使用规则引擎执行干预
                 result = self._process_with_rule_engine_v2(intervention_analysis)
             
-            # 记录交互
-            self.memory_manager.add_interaction(
-                player_id=player_id,
-                interaction_type="trigger_event_v2",
-                content={
-                    "intervention_analysis": intervention_analysis,
-                    "execution_result": result
-                }
-            )
+            return self._finish_trigger_event(player_id, intervention_analysis, result, start_time)
             
-            # 更新统计
-            if result.get("success", False):
-                self.success_count += 1
+        except Exception as e:
+            self.logger.exception(f"处理触发事件时出错: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "player_id": player_id,
+                "timestamp": datetime.now().isoformat()
+            }
+    
+    async def arun_intervention(self, 
+                                player_id: str, 
+                                trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+        """异步处理触发事件，LLM调用通过ainvoke执行，便于多个玩家并发等待
+        
+        Args:
+            player_id: 玩家ID
+            trigger_context: 触发上下文信息
             
-            processing_time = (datetime.now() - start_time).total_seconds()
-            self.total_response_time += processing_time  # 累加响应时间
-            result["processing_time_seconds"] = processing_time
-            result["timestamp"] = datetime.now().isoformat()
+        Returns:
+            Dict[str, Any]: 处理结果
+        """
+        self.intervention_count += 1
+        start_time = datetime.now()
+        
+        self.logger.info(f"开始异步处理玩家 {player_id} 的触发事件")
+        try:
+            intervention_analysis = await self._aprepare_trigger_event(player_id, trigger_context)
+            if not intervention_analysis["intervention_needed"]:
+                return self._finish_without_intervention(player_id, intervention_analysis, start_time)
             
-            self.logger.info(f"完成处理玩家 {player_id} 的事件，耗时 {processing_time:.2f} 秒")
+            if self.agent_executor:
+                result = await self._aprocess_with_llm_agent(
+                    intervention_analysis,
+                    cacheable=self._is_cacheable_trigger(trigger_context)
+                )
+            else:
+                result = self._process_with_rule_engine_v2(intervention_analysis)
             
-            return result
+            return self._finish_trigger_event(player_id, intervention_analysis, result, start_time)
             
         except Exception as e:
-            self.logger.error(f"处理触发事件时出错: {e}")
-            traceback.print_exc()
+            self.logger.exception(f"异步处理触发事件时出错: {e}")
             return {
                 "success": False,
                 "error": str(e),
@@ -369,6 +645,317 @@ Thought: {agent_scratchpad}
                 "timestamp": datetime.now().isoformat()
             }
     
+    async def abatch_trigger_events(self, 
+                                    events: List[Tuple[str, Dict[str, Any]]],
+                                    max_concurrency: int = 16) -> List[Dict[str, Any]]:
+        """处理一批触发事件，不同玩家之间并发
+        
+        同一玩家的事件按输入顺序串行处理：前一次干预会重置失败计数、降低受挫程度，
+        后续事件需要基于更新后的状态判断，避免重复干预
+        
+        Args:
+            events: (玩家ID, 触发上下文) 列表
+            max_concurrency: 同时进行的LLM调用上限
+            
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的处理结果
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(events)
+        
+        indices_by_player: Dict[str, List[int]] = {}
+        for index, (player_id, _) in enumerate(events):
+            indices_by_player.setdefault(player_id, []).append(index)
+        
+        async def _run_player(indices: List[int]):
+            for index in indices:
+                player_id, trigger_context = events[index]
+                async with semaphore:
+                    results[index] = await self.arun_intervention(player_id, trigger_context)
+        
+        await asyncio.gather(*(_run_player(indices) for indices in indices_by_player.values()))
+        return results
+    
+    async def submit_trigger_event(self, 
+                                   player_id: str, 
+                                   trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+        """提交触发事件，与短时间窗口内到达的其他事件合并为一批并发处理
+        
+        窗口内的事件数达到 TRIGGER_BATCH_MAX_SIZE 时立即处理，
+        否则等待 TRIGGER_BATCH_WINDOW_SECONDS 后处理
+        
+        Args:
+            player_id: 玩家ID
+            trigger_context: 触发上下文信息
+            
+        Returns:
+            Dict[str, Any]: 该事件的处理结果
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_events.append((player_id, trigger_context, future))
+        
+        if len(self._pending_events) >= TRIGGER_BATCH_MAX_SIZE:
+            self._flush_pending_events()
+        elif self._batch_flush_handle is None:
+            self._batch_flush_handle = loop.call_later(
+                TRIGGER_BATCH_WINDOW_SECONDS, self._flush_pending_events
+            )
+        
+        return await future
+    
+    def _flush_pending_events(self):
+        """把当前窗口内积累的事件作为一批提交处理"""
+        if self._batch_flush_handle is not None:
+            self._batch_flush_handle.cancel()
+            self._batch_flush_handle = None
+        
+        pending, self._pending_events = self._pending_events, []
+        if pending:
+            task = asyncio.ensure_future(self._run_pending_batch(pending))
+            # 保留任务引用，避免执行中被回收
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _run_pending_batch(self, pending: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        """并发处理一批事件，并把结果分发给各自的等待方
+        
+        Args:
+            pending: (玩家ID, 触发上下文, 结果Future) 列表
+        """
+        try:
+            results = await self.abatch_trigger_events(
+                [(player_id, trigger_context) for player_id, trigger_context, _ in pending],
+                max_concurrency=TRIGGER_BATCH_MAX_SIZE
+            )
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def _is_cacheable_trigger(self, trigger_context: Any) -> bool:
+        """判断触发事件的响应能否走响应缓存
+        
+        机器人检测、流失风险等安全相关的触发条件每次都必须重新执行
+        
+        Args:
+            trigger_context: 触发上下文（TriggerEvent 或字典）
+            
+        Returns:
+            bool: 是否允许使用响应缓存
+        """
+        if not self.settings.response_cache_enabled:
+            return False
+        condition = _trigger_field(trigger_context, "trigger_condition")
+        return getattr(condition, "name", None) not in UNCACHEABLE_TRIGGER_CONDITIONS
+    
+    @staticmethod
+    def _response_cache_key(intervention_analysis: Dict[str, Any]) -> Tuple[str, str, str, str]:
+        """构建响应缓存键，只包含决定干预内容的字段
+        
+        Args:
+            intervention_analysis: 干预分析结果
+            
+        Returns:
+            Tuple[str, str, str, str]: (玩家ID, 干预类型, 干预原因, 情绪摘要)
+        """
+        return (
+            intervention_analysis["context"].get("player_id", ""),
+            intervention_analysis["suggested_intervention_type"],
+            intervention_analysis["intervention_reason"],
+            intervention_analysis["player_mood_summary"]
+        )
+    
+    def _replay_cached_response(self, 
+                                response: Dict[str, Any],
+                                intervention_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """基于缓存的响应构建执行结果，并重新执行其中的投递类工具
+        
+        文案生成、状态查询等无副作用的工具输出直接复用，邮件等投递动作每次都真实执行
+        
+        Args:
+            response: 缓存的Agent响应
+            intervention_analysis: 干预分析结果
+            
+        Returns:
+            Dict[str, Any]: 执行结果
+        """
+        steps = []
+        for action, observation in response.get("intermediate_steps", []):
+            if action.tool in DELIVERY_TOOL_NAMES:
+                observation = self._tools_by_name[action.tool].run(action.tool_input)
+            steps.append((action, observation))
+        
+        result = self._handle_execution_response({**response, "intermediate_steps": steps}, intervention_analysis)
+        result["method"] = "response_cache"
+        return result
+    
+    async def _areplay_cached_response(self, 
+                                       response: Dict[str, Any],
+                                       intervention_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """_replay_cached_response 的异步版本，投递类工具通过 arun 执行
+        
+        Args:
+            response: 缓存的Agent响应
+            intervention_analysis: 干预分析结果
+            
+        Returns:
+            Dict[str, Any]: 执行结果
+        """
+        steps = []
+        for action, observation in response.get("intermediate_steps", []):
+            if action.tool in DELIVERY_TOOL_NAMES:
+                observation = await self._tools_by_name[action.tool].arun(action.tool_input)
+            steps.append((action, observation))
+        
+        result = self._handle_execution_response({**response, "intermediate_steps": steps}, intervention_analysis)
+        result["method"] = "response_cache"
+        return result
+    
+    def _prepare_trigger_event(self, player_id: str, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+        """执行分析和准备流程，并把玩家ID写入上下文
+        
+        Args:
+            player_id: 玩家ID
+            trigger_context: 触发上下文信息
+            
+        Returns:
+            Dict[str, Any]: 干预分析结果
+        """
+        intervention_analysis = self._analyze_and_prepare_intervention(player_id, trigger_context)
+        self.logger.debug("intervention_analysis: %r", intervention_analysis)
+        
+        # 添加玩家ID到上下文中，供规则引擎使用
+        intervention_analysis["context"]["player_id"] = player_id
+        return intervention_analysis
+    
+    async def _aprepare_trigger_event(self, player_id: str, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+        """_prepare_trigger_event 的异步版本
+        
+        Args:
+            player_id: 玩家ID
+            trigger_context: 触发上下文信息
+            
+        Returns:
+            Dict[str, Any]: 干预分析结果
+        """
+        intervention_analysis = await self._aanalyze_and_prepare_intervention(player_id, trigger_context)
+        self.logger.debug("intervention_analysis: %r", intervention_analysis)
+        
+        intervention_analysis["context"]["player_id"] = player_id
+        return intervention_analysis
+    
+    def _finish_trigger_event(self, 
+                              player_id: str,
+                              intervention_analysis: Dict[str, Any],
+                              result: Dict[str, Any],
+                              start_time: datetime) -> Dict[str, Any]:
+        """记录交互、更新统计并补充耗时信息
+        
+        Args:
+            player_id: 玩家ID
+            intervention_analysis: 干预分析结果
+            result: 执行结果
+            start_time: 开始处理的时间
+            
+        Returns:
+            Dict[str, Any]: 补充后的处理结果
+        """
+        # 记录交互
+        self._record_interaction({
+            "player_id": player_id,
+            "interaction_type": "trigger_event_v2",
+            "content": {
+                "intervention_analysis": intervention_analysis,
+                "execution_result": result
+            }
+        })
+        
+        # 更新统计
+        if result.get("success", False):
+            self.success_count += 1
+        
+        # 耗时和结果时间戳取自同一时刻
+        now = datetime.now()
+        processing_time = (now - start_time).total_seconds()
+        self.total_response_time += processing_time  # 累加响应时间
+        result["processing_time_seconds"] = processing_time
+        result["timestamp"] = now.isoformat()
+        
+        self.logger.info(f"完成处理玩家 {player_id} 的事件，耗时 {processing_time:.2f} 秒")
+        
+        return result
+    
+    def _record_interaction(self, interaction: Dict[str, Any]):
+        """把交互记录交给后台线程写入，队列满时在当前线程同步写入
+        
+        Args:
+            interaction: add_interaction 的关键字参数
+        """
+        try:
+            self._memory_queue.put_nowait(interaction)
+        except queue.Full:
+            with self._memory_lock:
+                self.memory_manager.add_interaction(**interaction)
+    
+    def _drain_memory_queue(self):
+        """后台线程：依次写入队列中的交互记录，收到 None 时退出"""
+        while True:
+            interaction = self._memory_queue.get()
+            try:
+                if interaction is None:
+                    return
+                with self._memory_lock:
+                    self.memory_manager.add_interaction(**interaction)
+            except Exception as e:
+                self.logger.exception("写入交互记录失败: %s", e)
+            finally:
+                self._memory_queue.task_done()
+    
+    def flush_memory_writes(self):
+        """等待已入队的交互记录全部写入记忆管理器"""
+        self._memory_queue.join()
+    
+    def close(self):
+        """关闭智能体：写完剩余的交互记录、停止后台线程并释放HTTP连接池"""
+        if self._memory_writer.is_alive():
+            self._memory_queue.put(None)
+            self._memory_writer.join()
+        self._analysis_executor.shutdown(wait=True)
+        if self._http_client is not None:
+            self._http_client.close()
+    
+    def _finish_without_intervention(self, 
+                                     player_id: str,
+                                     intervention_analysis: Dict[str, Any],
+                                     start_time: datetime) -> Dict[str, Any]:
+        """无需干预时的快速收尾：只更新统计，不记录交互、不执行任何动作
+        
+        Args:
+            player_id: 玩家ID
+            intervention_analysis: 干预分析结果
+            start_time: 开始处理的时间
+            
+        Returns:
+            Dict[str, Any]: 处理结果
+        """
+        now = datetime.now()
+        processing_time = (now - start_time).total_seconds()
+        self.success_count += 1
+        self.total_response_time += processing_time
+        
+        result = dict(NO_INTERVENTION_RESULT)
+        result["reason"] = intervention_analysis.get("intervention_reason") or "无需干预"
+        result["player_id"] = player_id
+        result["processing_time_seconds"] = processing_time
+        result["timestamp"] = now.isoformat()
+        return result
+    
     def _build_execution_instruction(self, intervention_analysis: Dict[str, Any]) -> str:
         """构建执行指令
         
@@ -378,32 +965,47 @@ Thought: {agent_scratchpad}
         Returns:
             str: 格式化的执行指令
         """
-        instruction = f"""请执行以下干预计划：
-
-干预类型：{intervention_analysis['suggested_intervention_type']}
-干预原因：{intervention_analysis['intervention_reason']}
-玩家情绪状态：{intervention_analysis['player_mood_summary']}
-
-执行要求：
-1. 根据干预类型选择合适的工具执行干预
-2. 确保干预内容符合玩家当前情绪状态
-3. 记录执行过程和结果
-
-可用的干预类型说明：
-- comfort: 使用GenerateSoothingMessageTool发送安慰消息
-- reward: 使用SendInGameMailTool发送奖励邮件
-- guidance: 使用SendInGameMailTool发送引导建议
-- proactive_offer: 使用SendInGameMailTool发送主动关怀
-
-上下文信息：
-{json.dumps(intervention_analysis['context'], indent=2, ensure_ascii=False)}
-
-关键分析数据：
-{json.dumps(intervention_analysis['key_analysis_data'], indent=2, ensure_ascii=False)}
-
-请立即执行相应的干预动作。"""
+        context = intervention_analysis['context']
+        try:
+            # 预筛选上下文是只含标量的扁平字典，相同内容直接复用序列化结果
+            context_json = _dumps_flat_context(tuple(context.items()))
+        except TypeError:
+            context_json = _dumps_indented(context)
+        
+        return EXECUTION_INSTRUCTION_TEMPLATE.format(
+            prefix=self._get_instruction_prefix(intervention_analysis),
+            context=context_json,
+            key_analysis_data=_dumps_indented(intervention_analysis['key_analysis_data'])
+        )
+    
+    def _get_instruction_prefix(self, intervention_analysis: Dict[str, Any]) -> str:
+        """获取执行指令的前缀部分，同一玩家的相同干预计划直接复用
+        
+        Args:
+            intervention_analysis: 干预分析结果
+            
+        Returns:
+            str: 指令前缀
+        """
+        key = (
+            intervention_analysis.get('context', {}).get('player_id', ''),
+            intervention_analysis['suggested_intervention_type'],
+            intervention_analysis['intervention_reason'],
+            intervention_analysis['player_mood_summary']
+        )
+        prefix = self._prefix_cache.get(key)
+        if prefix is not None:
+            return prefix
         
-        return instruction
+        prefix = INSTRUCTION_PREFIX_TEMPLATE.format(
+            intervention_type=key[1],
+            intervention_reason=key[2],
+            player_mood_summary=key[3]
+        )
+        if len(self._prefix_cache) >= 256:
+            self._prefix_cache.clear()
+        self._prefix_cache[key] = prefix
+        return prefix
     
     def _get_execution_system_prompt(self) -> str:
         """获取执行系统提示词
@@ -411,21 +1013,7 @@ Thought: {agent_scratchpad}
         Returns:
             str: 系统提示词
         """
-        return """你是一个智能游戏干预执行助手。你的任务是根据分析结果执行具体的干预动作。
-
-执行原则：
-1. 严格按照干预类型选择合适的工具
-2. 确保干预内容个性化且有针对性
-3. 记录所有执行步骤和结果
-4. 如果执行失败，提供详细的错误信息
-
-可用工具说明：
-- GenerateSoothingMessageTool: 生成安慰消息
-- SendInGameMailTool: 发送游戏内邮件
-- UpdatePlayerStatusTool: 更新玩家状态
-- LogInteractionTool: 记录交互日志
-
-请根据用户提供的干预计划，选择合适的工具并执行。"""
+        return EXECUTION_SYSTEM_PROMPT
     
     def _handle_execution_response(self, response: Dict[str, Any], 
                                  intervention_analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -458,11 +1046,14 @@ Thought: {agent_scratchpad}
                 "intervention_analysis": intervention_analysis
             }
 
-    def _process_with_llm_agent(self, intervention_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_with_llm_agent(self, 
+                                intervention_analysis: Dict[str, Any],
+                                cacheable: bool = True) -> Dict[str, Any]:
         """纯粹的执行引擎：根据干预分析结果执行相应动作
         
         Args:
             intervention_analysis: 来自_analyze_and_prepare_intervention的结构化分析结果
+            cacheable: 是否允许复用响应缓存中的工具输出
             
         Returns:
             Dict[str, Any]: 执行结果
@@ -484,6 +1075,11 @@ Thought: {agent_scratchpad}
         try:
             # 构建执行指令
             execution_instruction = self._build_execution_instruction(intervention_analysis)
+            cache_key = self._response_cache_key(intervention_analysis)
+            if cacheable:
+                cached_response = self.response_cache.lookup(cache_key)
+                if cached_response is not None:
+                    return self._replay_cached_response(cached_response, intervention_analysis)
             
             # 调用Agent执行器执行干预
             self.logger.info(
@@ -494,6 +1090,8 @@ Thought: {agent_scratchpad}
             response = self.agent_executor.invoke({
                 "input": execution_instruction
             })
+            if cacheable:
+                self.response_cache.store(cache_key, response)
             
             # 处理执行响应
             result = self._handle_execution_response(response, intervention_analysis)
@@ -501,8 +1099,57 @@ Thought: {agent_scratchpad}
             return result
             
         except Exception as e:
-            traceback.print_exc()
-            self.logger.error(f"LLM Agent执行失败: {e}")
+            self.logger.exception(f"LLM Agent执行失败: {e}")
+            return {
+                "success": False,
+                "reason": f"执行失败: {str(e)}",
+                "intervention_analysis": intervention_analysis
+            }
+    
+    async def _aprocess_with_llm_agent(self, 
+                                       intervention_analysis: Dict[str, Any],
+                                       cacheable: bool = True) -> Dict[str, Any]:
+        """_process_with_llm_agent 的异步版本，使用 ainvoke 等待LLM响应
+        
+        Args:
+            intervention_analysis: 来自_analyze_and_prepare_intervention的结构化分析结果
+            cacheable: 是否允许复用响应缓存中的工具输出
+            
+        Returns:
+            Dict[str, Any]: 执行结果
+        """
+        if not intervention_analysis.get("intervention_needed", False):
+            self.logger.info("无需干预，跳过执行")
+            return {
+                "success": True,
+                "intervention_needed": False,
+                "reason": intervention_analysis.get("intervention_reason", "无需干预"),
+                "intervention_analysis": intervention_analysis
+            }
+        
+        try:
+            execution_instruction = self._build_execution_instruction(intervention_analysis)
+            cache_key = self._response_cache_key(intervention_analysis)
+            if cacheable:
+                cached_response = self.response_cache.lookup(cache_key)
+                if cached_response is not None:
+                    return await self._areplay_cached_response(cached_response, intervention_analysis)
+            
+            self.logger.info(
+                f"执行{intervention_analysis['suggested_intervention_type']}干预: "
+                f"{intervention_analysis['intervention_reason']}"
+            )
+            
+            response = await self.agent_executor.ainvoke({
+                "input": execution_instruction
+            })
+            if cacheable:
+                self.response_cache.store(cache_key, response)
+            
+            return self._handle_execution_response(response, intervention_analysis)
+            
+        except Exception as e:
+            self.logger.exception(f"LLM Agent异步执行失败: {e}")
             return {
                 "success": False,
                 "reason": f"执行失败: {str(e)}",
@@ -602,35 +1249,29 @@ Thought: {agent_scratchpad}
         Returns:
             Dict[str, Any]: 干预计划
         """
-        plan = {
-            "message_type": "soothing",
-            "message_content": "",
-            "rewards": [],
-            "priority": "normal"
-        }
-        
-        # 根据玩家价值调整干预强度
+        # 根据玩家价值确定干预强度
         if player.is_high_value():
-            plan["priority"] = "high"
-            plan["rewards"].extend(["gold:1000", "gem:50"])
+            tier = "high"
         elif player.vip_level >= 3:
-            plan["priority"] = "medium"
-            plan["rewards"].extend(["gold:500", "gem:20"])
+            tier = "medium"
         else:
-            plan["rewards"].extend(["gold:200", "gem:5"])
+            tier = "low"
+        priority, rewards = RULE_TIER_PLANS[tier]
         
-        # 根据行为模式调整消息
-        if behavior_analysis["pattern"] == "high_frustration":
-            plan["message_content"] = f"亲爱的玩家，我们注意到您最近遇到了一些挑战。请不要气馁，每个强者都会经历挫折。我们为您准备了一些资源来帮助您重新出发！"
-        elif behavior_analysis["pattern"] == "seeking_help":
-            plan["message_content"] = f"我们看到您在寻求帮助，这很棒！我们为您准备了一些实用的建议和资源。记住，团队合作是成功的关键！"
-        else:
-            plan["message_content"] = f"感谢您对游戏的热情！我们为您准备了一些小礼物，希望能让您的游戏体验更加愉快。"
+        plan = {
+            "message_type": "soothing",
+            # 根据行为模式选择消息
+            "message_content": RULE_PATTERN_MESSAGES.get(
+                behavior_analysis["pattern"], RULE_PATTERN_MESSAGES["default"]
+            ),
+            "rewards": list(rewards),
+            "priority": priority
+        }
         
         # 根据连续失败次数调整
         if player.consecutive_failures >= 3:
             plan["rewards"].append("equipment_enhance_stone:3")
-            plan["message_content"] += "\n\n另外，我们为您提供了装备强化石，帮助您提升实力！"
+            plan["message_content"] += RULE_FAILURE_SUPPLEMENT
         
         return plan
     
@@ -685,7 +1326,8 @@ Thought: {agent_scratchpad}
             Dict[str, Any]: 统计信息
         """
         uptime = (datetime.now() - self.start_time).total_seconds()
-        memory_stats = self.memory_manager.get_memory_stats()
+        with self._memory_lock:
+            memory_stats = self.memory_manager.get_memory_stats()
         average_response_time = self.total_response_time / self.intervention_count if self.intervention_count > 0 else 0.0
         
         return {
@@ -699,7 +1341,8 @@ Thought: {agent_scratchpad}
             "llm_available": self.llm is not None,
             "agent_executor_available": self.agent_executor is not None,
             "tools_count": len(self.tools),
-            "memory_stats": memory_stats
+            "memory_stats": memory_stats,
+            "response_cache_stats": self.response_cache.get_stats()
         }
     
     def cleanup_old_data(self, max_age_hours: int = 24):
@@ -708,7 +1351,8 @@ Thought: {agent_scratchpad}
         Args:
             max_age_hours: 最大保留时间（小时）
         """
-        self.memory_manager.cleanup_old_memories(max_age_hours)
+        with self._memory_lock:
+            self.memory_manager.cleanup_old_memories(max_age_hours)
     
     def process_player_action(self, player, action) -> Dict[str, Any]:
         """处理玩家动作并触发分析
@@ -722,25 +1366,13 @@ Thought: {agent_scratchpad}
         """
         try:
             self.data_manager.add_action(action)
-
-            # 构建触发上下文
-            trigger_context = {
-                "event_id": f"action_{action.action_id}",
-                "triggered_at": action.timestamp.isoformat(),
-                "triggering_actions": [action],
-                "action_type": action.action_type.value,
-                "player_action": action
-            }
             
             # 调用现有的触发事件处理逻辑
+            trigger_context = self._build_action_trigger_context(action)
             result = self.process_trigger_event(player.player_id, trigger_context)
             
-            # 添加动作相关信息到结果中
-            result["action_processed"] = {
-                "action_id": action.action_id,
-                "action_type": action.action_type.value,
-                "timestamp": action.timestamp.isoformat()
-            }
+            # 添加动作相关信息到结果中，复用上下文里已格式化的动作时间
+            result["action_processed"] = self._describe_processed_action(action, trigger_context["triggered_at"])
             
             return result
             
@@ -753,6 +1385,95 @@ Thought: {agent_scratchpad}
                 "timestamp": datetime.now().isoformat()
             }
     
+    def process_player_actions_batch(self, 
+                                     items: List[Tuple[Any, Any]],
+                                     batch_size: int = 16,
+                                     inter_batch_delay: float = 0.0) -> List[Dict[str, Any]]:
+        """批量处理玩家动作：一次写入所有动作，再按批并发执行触发处理
+        
+        每批内的事件通过 abatch_trigger_events 并发等待LLM，
+        批与批之间可以插入间隔以配合接口限流。不能在已运行的事件循环中调用
+        
+        Args:
+            items: (玩家对象, PlayerAction对象) 列表，按发生顺序排列
+            batch_size: 每批并发处理的事件数
+            inter_batch_delay: 两批之间的等待时间（秒）
+            
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的处理结果
+        """
+        if not items:
+            return []
+        
+        self.data_manager.add_actions([action for _, action in items])
+        events = [
+            (player.player_id, self._build_action_trigger_context(action))
+            for player, action in items
+        ]
+        results = asyncio.run(self._arun_in_batches(events, batch_size, inter_batch_delay))
+        
+        for (_, action), (_, trigger_context), result in zip(items, events, results):
+            result["action_processed"] = self._describe_processed_action(action, trigger_context["triggered_at"])
+        return results
+    
+    async def _arun_in_batches(self, 
+                               events: List[Tuple[str, Dict[str, Any]]],
+                               batch_size: int,
+                               inter_batch_delay: float) -> List[Dict[str, Any]]:
+        """按批依次并发处理触发事件
+        
+        Args:
+            events: (玩家ID, 触发上下文) 列表
+            batch_size: 每批事件数
+            inter_batch_delay: 两批之间的等待时间（秒）
+            
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的处理结果
+        """
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(events), batch_size):
+            if start and inter_batch_delay > 0:
+                await asyncio.sleep(inter_batch_delay)
+            results.extend(await self.abatch_trigger_events(
+                events[start:start + batch_size], max_concurrency=batch_size
+            ))
+        return results
+    
+    @staticmethod
+    def _build_action_trigger_context(action) -> Dict[str, Any]:
+        """由单个玩家动作构建触发上下文
+        
+        Args:
+            action: PlayerAction对象
+            
+        Returns:
+            Dict[str, Any]: 触发上下文
+        """
+        return {
+            "event_id": f"action_{action.action_id}",
+            "triggered_at": action.timestamp.isoformat(),
+            "triggering_actions": [action],
+            "action_type": action.action_type.value,
+            "player_action": action
+        }
+    
+    @staticmethod
+    def _describe_processed_action(action, timestamp: str) -> Dict[str, Any]:
+        """生成结果中附带的动作信息
+        
+        Args:
+            action: PlayerAction对象
+            timestamp: 已格式化的动作时间
+            
+        Returns:
+            Dict[str, Any]: 动作ID、类型和时间
+        """
+        return {
+            "action_id": action.action_id,
+            "action_type": action.action_type.value,
+            "timestamp": timestamp
+        }
+    
     def _analyze_and_prepare_intervention(self, player_id: str, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
         """统一的分析方法：执行两阶段干预决策
         
@@ -763,6 +1484,53 @@ Thought: {agent_scratchpad}
         Returns:
             Dict[str, Any]: 结构化的干预分析结果
         """
+        intervention_analysis, player, rule_based_result = self._prescreen_intervention(player_id, trigger_context)
+        if player is None:
+            return intervention_analysis
+        
+        try:
+            # 阶段二：执行深度分析
+            deep_analysis_result = self._perform_deep_analysis(player, trigger_context)
+            self._apply_deep_analysis(intervention_analysis, player, rule_based_result, deep_analysis_result)
+        except Exception as e:
+            self.logger.exception("分析和准备干预时出错: %s", e)
+            intervention_analysis["intervention_reason"] = f"分析过程出错: {str(e)}"
+        
+        return intervention_analysis
+    
+    async def _aanalyze_and_prepare_intervention(self, player_id: str, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+        """_analyze_and_prepare_intervention 的异步版本，深度分析期间不阻塞事件循环
+        
+        Args:
+            player_id: 玩家ID
+            trigger_context: 触发上下文
+            
+        Returns:
+            Dict[str, Any]: 结构化的干预分析结果
+        """
+        intervention_analysis, player, rule_based_result = self._prescreen_intervention(player_id, trigger_context)
+        if player is None:
+            return intervention_analysis
+        
+        try:
+            deep_analysis_result = await self._aperform_deep_analysis(player, trigger_context)
+            self._apply_deep_analysis(intervention_analysis, player, rule_based_result, deep_analysis_result)
+        except Exception as e:
+            self.logger.exception("分析和准备干预时出错: %s", e)
+            intervention_analysis["intervention_reason"] = f"分析过程出错: {str(e)}"
+        
+        return intervention_analysis
+    
+    def _prescreen_intervention(self, player_id: str, trigger_context: Dict[str, Any]) -> Tuple[Dict[str, Any], Any, Optional[Dict[str, Any]]]:
+        """阶段一：获取玩家并执行规则预筛选
+        
+        Args:
+            player_id: 玩家ID
+            trigger_context: 触发上下文
+            
+        Returns:
+            Tuple: (干预分析结果, 玩家对象, 预筛选结果)；分析已在本阶段结束时玩家对象为None
+        """
         # 初始化结果结构
         intervention_analysis = {
             "intervention_needed": False,
@@ -781,93 +1549,93 @@ Thought: {agent_scratchpad}
         try:
             # 获取玩家信息
             player = self.data_manager.get_player(player_id)
-            print("_analyze_and_prepare_player:",player)
+            self.logger.debug("_analyze_and_prepare_player: %r", player)
             if not player:
                 self.logger.warning(f"未找到玩家 {player_id}")
                 intervention_analysis["intervention_reason"] = "玩家不存在"
-                return intervention_analysis
+                return intervention_analysis, None, None
             
-            # 阶段一：基于规则的预筛选
+            # 基于规则的预筛选
             rule_based_result = self._rule_based_prescreening(player, trigger_context)
             
             if not rule_based_result["needs_deep_analysis"]:
                 # 预筛选未通过，无需干预
                 intervention_analysis["intervention_reason"] = rule_based_result["reason"]
                 intervention_analysis["context"] = rule_based_result["context"]
-                return intervention_analysis
+                return intervention_analysis, None, rule_based_result
             
-            # 阶段二：基于LLM Agent的深度分析
             if not self.llm_client:
                 self.logger.warning("LLM客户端不可用，仅使用规则预筛选结果")
                 intervention_analysis["intervention_needed"] = rule_based_result["intervention_suggested"]
                 intervention_analysis["intervention_reason"] = rule_based_result["reason"]
                 intervention_analysis["suggested_intervention_type"] = rule_based_result["suggested_type"]
                 intervention_analysis["context"] = rule_based_result["context"]
-                return intervention_analysis
-            
-            # 执行深度分析
-            deep_analysis_result = self._perform_deep_analysis(player, trigger_context)
-            intervention_analysis["key_analysis_data"] = deep_analysis_result
-            
-            # 基于深度分析结果做最终决策
-            final_decision = self._make_final_intervention_decision(
-                player, rule_based_result, deep_analysis_result
-            )
+                return intervention_analysis, None, rule_based_result
             
-            # 更新最终结果
-            intervention_analysis.update(final_decision)
-            
-            if intervention_analysis["intervention_needed"]:
-                self.logger.info(
-                    f"玩家 {player_id} 需要干预: {intervention_analysis['suggested_intervention_type']} - "
-                    f"{intervention_analysis['intervention_reason']}"
-                )
+            return intervention_analysis, player, rule_based_result
             
         except Exception as e:
-            traceback.print_exc()
-            self.logger.error(f"分析和准备干预时出错: {e}")
+            self.logger.exception("分析和准备干预时出错: %s", e)
             intervention_analysis["intervention_reason"] = f"分析过程出错: {str(e)}"
+            return intervention_analysis, None, None
+    
+    def _apply_deep_analysis(self, 
+                             intervention_analysis: Dict[str, Any],
+                             player,
+                             rule_based_result: Dict[str, Any],
+                             deep_analysis_result: Dict[str, Any]):
+        """基于深度分析结果做最终决策，并写回干预分析结果
         
-        return intervention_analysis
+        Args:
+            intervention_analysis: 干预分析结果（原地更新）
+            player: 玩家对象
+            rule_based_result: 规则预筛选结果
+            deep_analysis_result: 深度分析结果
+        """
+        intervention_analysis["key_analysis_data"] = deep_analysis_result
+        
+        final_decision = self._make_final_intervention_decision(
+            player, rule_based_result, deep_analysis_result
+        )
+        
+        # 更新最终结果
+        intervention_analysis.update(final_decision)
+        
+        if intervention_analysis["intervention_needed"]:
+            self.logger.info(
+                f"玩家 {player.player_id} 需要干预: {intervention_analysis['suggested_intervention_type']} - "
+                f"{intervention_analysis['intervention_reason']}"
+            )
     
-    def _extract_behavior_data(self, player, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_behavior_data(self, player, trigger_context: Dict[str, Any]) -> BehaviorData:
         """提取行为数据
         
+        触发信息不包含事件ID和触发时间：这两项每个事件都不同，且分析工具用不到，
+        去掉后行为相同的不同触发事件得到相同的行为数据，可以共用深度分析结果
+        
         Args:
             player: 玩家对象
             trigger_context: 触发上下文
             
         Returns:
-            Dict[str, Any]: 行为数据
+            BehaviorData: 行为数据
         """
-        behavior_data = {
-            "player_basic_info": {
-                "player_id": player.player_id,
-                "username": player.username,
-                "vip_level": player.vip_level,
-                "total_playtime_hours": player.total_playtime_hours,
-                "last_login": player.last_login.isoformat() if player.last_login else None,
-                "total_spent": player.total_spent,
-                "current_status": player.current_status.value,
-                "frustration_level": player.frustration_level,
-                "consecutive_failures": player.consecutive_failures
-            },
-            "trigger_info": {
-                "event_id": getattr(trigger_context, 'event_id', None),
-                "trigger_condition": getattr(trigger_context, 'trigger_condition', {}).name if hasattr(getattr(trigger_context, 'trigger_condition', {}), 'name') else None,
-                "triggered_at": getattr(trigger_context, 'triggered_at', None),
-                "triggering_actions": getattr(trigger_context, 'triggering_actions', [])
-            },
-            "recent_activity": {
-                "login_frequency": "daily",  # 这里可以从实际数据中获取
-                "session_duration": "2-3 hours",
-                "task_completion_rate": 0.75,
-                "social_interactions": 5,
-                "purchase_behavior": "occasional"
-            }
+        player_basic_info = {
+            "player_id": player.player_id,
+            "username": player.username,
+            "vip_level": player.vip_level,
+            "total_playtime_hours": player.total_playtime_hours,
+            "last_login": player.last_login.isoformat() if player.last_login else None,
+            "total_spent": player.total_spent,
+            "current_status": player.current_status.value,
+            "frustration_level": player.frustration_level,
+            "consecutive_failures": player.consecutive_failures
         }
-        
-        return behavior_data
+        trigger_info = {
+            "trigger_condition": getattr(_trigger_field(trigger_context, "trigger_condition"), "name", None),
+            "triggering_actions": _trigger_field(trigger_context, "triggering_actions", [])
+        }
+        return BehaviorData(player_basic_info, trigger_info, dict(RECENT_ACTIVITY_PLACEHOLDER))
     
     def _perform_deep_analysis(self, player, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
         """阶段二：执行深度分析
@@ -879,72 +1647,221 @@ Thought: {agent_scratchpad}
         Returns:
             Dict[str, Any]: 深度分析结果
         """
-        analysis_results = {
-            "emotion_analysis": None,
-            "bot_detection": None,
-            "churn_risk_analysis": None
-        }
+        # 构建行为数据，三个分析工具共用同一份字典
+        behavior_data = self._extract_behavior_data(player, trigger_context).to_dict()
+        # 行为数据只序列化一次，同时用于缓存键和分析工具的提示词
+        behavior_data_json = _dumps_indented(behavior_data)
+        key = self._deep_analysis_key(player.player_id, behavior_data_json)
+        cached, future, owner = self._claim_deep_analysis(key)
+        if cached is not None:
+            return cached
+        if not owner:
+            return dict(future.result())
         
+        analysis_results = dict.fromkeys(task[0] for task in DEEP_ANALYSIS_TASKS)
         try:
-            # 构建行为数据
-            behavior_data = self._extract_behavior_data(player, trigger_context)
+            # 先做机器人检测：判定为机器人时其余两项结果用不到，不再调用LLM
+            _, tool_class, label, options = BOT_DETECTION_TASK
+            analysis_results["bot_detection"] = self._run_analysis_tool(
+                tool_class, label, player.player_id, behavior_data, behavior_data_json, options
+            )
+            if self._is_likely_bot(analysis_results["bot_detection"]):
+                self.logger.info(f"玩家 {player.player_id} 疑似机器人，跳过情绪和流失风险分析")
+            else:
+                # 其余分析相互独立，并发提交到线程池
+                futures = {
+                    result_key: self._analysis_executor.submit(
+                        self._run_analysis_tool,
+                        tool_class, label, player.player_id, behavior_data, behavior_data_json, options
+                    )
+                    for result_key, tool_class, label, options in FOLLOW_UP_ANALYSIS_TASKS
+                }
+                for result_key, task_future in futures.items():
+                    analysis_results[result_key] = task_future.result()
             
-            # 1. 情绪分析（优先级最高）
-            try:
-                emotion_tool = EmotionAnalysisTool(
-                    llm_client=self.llm_client,
-                    player_manager=getattr(self.data_manager, 'player_manager', None)
-                )
-                emotion_result = emotion_tool._run(
-                    player_id=player.player_id,
-                    behavior_data=behavior_data,
-                    analysis_depth="standard"
-                )
-                analysis_results["emotion_analysis"] = json.loads(emotion_result)
-                self.logger.info(f"完成玩家 {player.player_id} 的情绪分析")
-            except Exception as e:
-                traceback.print_exc()
-                self.logger.error(f"情绪分析失败: {e}")
+        except Exception as e:
+            self.logger.exception("深度分析过程中出错: %s", e)
+        finally:
+            self._release_deep_analysis(key, future, analysis_results)
+        
+        return analysis_results
+    
+    async def _aperform_deep_analysis(self, player, trigger_context: Dict[str, Any]) -> Dict[str, Any]:
+        """阶段二的异步版本：用 asyncio.gather 等待分析结果，不阻塞事件循环
+        
+        Args:
+            player: 玩家对象
+            trigger_context: 触发上下文
             
-            # 2. 机器人检测
-            try:
-                bot_tool = BotDetectionTool(
-                    llm_client=self.llm_client,
-                    player_manager=getattr(self.data_manager, 'player_manager', None)
-                )
-                bot_result = bot_tool._run(
-                    player_id=player.player_id,
-                    behavior_data=behavior_data,
-                    time_window_hours=24
+        Returns:
+            Dict[str, Any]: 深度分析结果
+        """
+        behavior_data = self._extract_behavior_data(player, trigger_context).to_dict()
+        # 行为数据只序列化一次，同时用于缓存键和分析工具的提示词
+        behavior_data_json = _dumps_indented(behavior_data)
+        key = self._deep_analysis_key(player.player_id, behavior_data_json)
+        cached, future, owner = self._claim_deep_analysis(key)
+        if cached is not None:
+            return cached
+        if not owner:
+            return dict(await asyncio.wrap_future(future))
+        
+        analysis_results = dict.fromkeys(task[0] for task in DEEP_ANALYSIS_TASKS)
+        try:
+            # 分析工具只有同步实现，放到线程池执行，事件循环继续处理其他玩家的事件
+            loop = asyncio.get_running_loop()
+            
+            # 先做机器人检测：判定为机器人时其余两项结果用不到，不再调用LLM
+            _, tool_class, label, options = BOT_DETECTION_TASK
+            analysis_results["bot_detection"] = await loop.run_in_executor(
+                self._analysis_executor,
+                self._run_analysis_tool,
+                tool_class, label, player.player_id, behavior_data, behavior_data_json, options
+            )
+            if self._is_likely_bot(analysis_results["bot_detection"]):
+                self.logger.info(f"玩家 {player.player_id} 疑似机器人，跳过情绪和流失风险分析")
+            else:
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            self._analysis_executor,
+                            self._run_analysis_tool,
+                            tool_class, label, player.player_id, behavior_data, behavior_data_json, options
+                        )
+                        for _, tool_class, label, options in FOLLOW_UP_ANALYSIS_TASKS
+                    ),
+                    return_exceptions=True
                 )
-                analysis_results["bot_detection"] = json.loads(bot_result)
-                self.logger.info(f"完成玩家 {player.player_id} 的机器人检测")
-            except Exception as e:
-                traceback.print_exc()
-                self.logger.error(f"机器人检测失败: {e}")
+                for (result_key, _, label, _), result in zip(FOLLOW_UP_ANALYSIS_TASKS, results):
+                    if isinstance(result, Exception):
+                        self.logger.error("%s失败 player=%s: %s", label, player.player_id, result)
+                    else:
+                        analysis_results[result_key] = result
             
-            # 3. 流失风险分析
-            try:
-                churn_tool = ChurnRiskAnalysisTool(
-                    llm_client=self.llm_client,
-                    player_manager=getattr(self.data_manager, 'player_manager', None)
+        except Exception as e:
+            self.logger.exception("深度分析过程中出错: %s", e)
+        finally:
+            self._release_deep_analysis(key, future, analysis_results)
+        
+        return analysis_results
+    
+    @staticmethod
+    def _is_likely_bot(bot_analysis: Optional[Dict[str, Any]]) -> bool:
+        """机器人检测结果是否判定为高概率机器人
+        
+        Args:
+            bot_analysis: 机器人检测结果
+            
+        Returns:
+            bool: 机器人概率是否超过 BOT_PROBABILITY_THRESHOLD
+        """
+        return bool(bot_analysis) and bot_analysis.get("is_bot_probability", 0) > BOT_PROBABILITY_THRESHOLD
+    
+    @staticmethod
+    def _deep_analysis_key(player_id: str, behavior_data_json: str) -> Tuple[str, bytes]:
+        """由玩家ID和行为数据内容生成深度分析缓存键
+        
+        行为数据由 _extract_behavior_data 按固定键顺序构建且不含事件ID和触发时间，
+        序列化结果可以直接作为内容摘要的输入
+        
+        Args:
+            player_id: 玩家ID
+            behavior_data_json: 序列化后的行为数据
+            
+        Returns:
+            Tuple[str, bytes]: (玩家ID, 行为数据的128位摘要)
+        """
+        return player_id, hashlib.blake2b(behavior_data_json.encode("utf-8"), digest_size=16).digest()
+    
+    def _claim_deep_analysis(self, key: Tuple[str, bytes]) -> Tuple[Optional[Dict[str, Any]], Optional[Future], bool]:
+        """查找缓存的深度分析结果，未命中时登记或加入进行中的分析
+        
+        Args:
+            key: 深度分析缓存键
+            
+        Returns:
+            Tuple: (缓存结果, 进行中的 Future, 是否由调用方负责执行分析)；
+                   缓存命中时后两项为 None 和 False
+        """
+        with self._analysis_cache_lock:
+            entry = self._analysis_cache.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._analysis_cache.move_to_end(key)
+                    return dict(entry[1]), None, False
+                del self._analysis_cache[key]
+            
+            future = self._analysis_inflight.get(key)
+            if future is not None:
+                return None, future, False
+            future = self._analysis_inflight[key] = Future()
+            return None, future, True
+    
+    def _release_deep_analysis(self, 
+                               key: Tuple[str, bytes],
+                               future: Future,
+                               analysis_results: Dict[str, Any]):
+        """保存深度分析结果并唤醒等待同一键的调用
+        
+        只缓存三项分析全部成功（工具返回 success=False 也算失败）或已判定为机器人的结果，
+        失败的分析下次重新执行
+        
+        Args:
+            key: 深度分析缓存键
+            future: 本次分析登记的 Future
+            analysis_results: 深度分析结果
+        """
+        with self._analysis_cache_lock:
+            self._analysis_inflight.pop(key, None)
+            if self.settings.deep_analysis_cache_ttl > 0 and (
+                self._is_likely_bot(analysis_results["bot_detection"]) or all(
+                    isinstance(result, dict) and result.get("success", True) is not False
+                    for result in analysis_results.values()
                 )
-                churn_result = churn_tool._run(
-                    player_id=player.player_id,
-                    behavior_data=behavior_data,
-                    time_window_days=30
+            ):
+                self._analysis_cache[key] = (
+                    time.monotonic() + self.settings.deep_analysis_cache_ttl, dict(analysis_results)
                 )
-                analysis_results["churn_risk_analysis"] = json.loads(churn_result)
-                self.logger.info(f"完成玩家 {player.player_id} 的流失风险分析")
-            except Exception as e:
-                traceback.print_exc()
-                self.logger.error(f"流失风险分析失败: {e}")
+                self._analysis_cache.move_to_end(key)
+                if len(self._analysis_cache) > self.settings.deep_analysis_cache_size:
+                    self._analysis_cache.popitem(last=False)
+        future.set_result(analysis_results)
+    
+    def _run_analysis_tool(self, 
+                           tool_class: type,
+                           label: str,
+                           player_id: str,
+                           behavior_data: Dict[str, Any],
+                           behavior_data_json: str,
+                           options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """运行单个分析工具并解析其JSON输出
+        
+        Args:
+            tool_class: 分析工具类
+            label: 分析名称，用于日志
+            player_id: 玩家ID
+            behavior_data: 行为数据
+            behavior_data_json: 序列化后的行为数据，传给 BEHAVIOR_JSON_TOOLS 中的工具
+            options: 工具的额外参数
             
+        Returns:
+            Optional[Dict[str, Any]]: 分析结果，失败时为None
+        """
+        try:
+            tool = self._analysis_tools.get(tool_class)
+            if tool is None:
+                # 初始化时未能创建的工具按需创建一次；工具不保存玩家状态，可并发复用
+                tool = tool_class(llm_client=self.llm_client, data_manager=self.data_manager)
+                self._analysis_tools[tool_class] = tool
+            if tool_class in BEHAVIOR_JSON_TOOLS:
+                options = {**options, "behavior_data_json": behavior_data_json}
+            result = tool._run(player_id=player_id, behavior_data=behavior_data, **options)
+            parsed = orjson.loads(result) if orjson is not None else json.loads(result)
+            self.logger.info(f"完成玩家 {player_id} 的{label}")
+            return parsed
         except Exception as e:
-            traceback.print_exc()
-            self.logger.error(f"深度分析过程中出错: {e}")
-        
-        return analysis_results
+            self.logger.exception("%s失败 player=%s: %s", label, player_id, e)
+            return None
     
     def _make_final_intervention_decision(self, player, rule_result: Dict[str, Any], 
                                         analysis_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -967,73 +1884,76 @@ Thought: {agent_scratchpad}
         }
         
         try:
+            # 三项分析结果各取一次，缺失时用空字典代替
+            bot_analysis = analysis_data.get("bot_detection") or {}
+            emotion_analysis = analysis_data.get("emotion_analysis") or {}
+            churn_analysis = analysis_data.get("churn_risk_analysis") or {}
+            context = decision["context"]
+            
             # 检查机器人检测结果
-            bot_analysis = analysis_data.get("bot_detection")
-            if bot_analysis and bot_analysis.get("is_bot_probability", 0) > 0.8:
+            if self._is_likely_bot(bot_analysis):
                 decision["intervention_reason"] = "检测到高概率机器人行为，无需人工干预"
                 decision["player_mood_summary"] = "疑似机器人用户"
                 return decision
             
             # 分析情绪状态
-            emotion_analysis = analysis_data.get("emotion_analysis")
-            mood_summary_parts = []
+            intervention_needed = False
+            intervention_type = "none"
+            intervention_reason = ""
+            mood_summary = ""
             
-            if emotion_analysis and emotion_analysis.get("success"):
+            if emotion_analysis.get("success"):
                 # 检查负面情绪
                 dominant_negative = emotion_analysis.get("dominant_negative_emotions", [])
                 dominant_positive = emotion_analysis.get("dominant_positive_emotions", [])
                 
                 if len(dominant_negative) >= 2:
-                    decision["intervention_needed"] = True
-                    decision["suggested_intervention_type"] = "comfort"
-                    decision["intervention_reason"] = (
-                        f"玩家表现出多种负面情绪 ({', '.join(dominant_negative)})，"
-                        f"结合{rule_result['reason']}，需要安慰干预"
+                    mood_summary = _join_emotions(tuple(dominant_negative))
+                    intervention_needed = True
+                    intervention_type = "comfort"
+                    intervention_reason = COMFORT_REASON_TEMPLATE.format(
+                        emotions=mood_summary, rule_reason=rule_result['reason']
                     )
-                    mood_summary_parts.extend(dominant_negative)
                     
                 elif len(dominant_positive) >= 2:
-                    decision["intervention_needed"] = True
-                    decision["suggested_intervention_type"] = "reward"
-                    decision["intervention_reason"] = (
-                        f"玩家表现出积极情绪 ({', '.join(dominant_positive)})，"
-                        f"适合给予奖励干预"
-                    )
-                    mood_summary_parts.extend(dominant_positive)
+                    mood_summary = _join_emotions(tuple(dominant_positive))
+                    intervention_needed = True
+                    intervention_type = "reward"
+                    intervention_reason = REWARD_REASON_TEMPLATE.format(emotions=mood_summary)
                 
                 # 添加情绪数据到上下文
-                decision["context"]["emotion_analysis"] = {
+                context["emotion_analysis"] = {
                     "dominant_negative_emotions": dominant_negative,
                     "dominant_positive_emotions": dominant_positive,
                     "intervention_type": emotion_analysis.get("intervention_type", "none")
                 }
             
             # 检查流失风险
-            churn_analysis = analysis_data.get("churn_risk_analysis")
-            if churn_analysis and churn_analysis.get("risk_level") in ["high", "critical"]:
-                if not decision["intervention_needed"]:
-                    decision["intervention_needed"] = True
-                    decision["suggested_intervention_type"] = "proactive_offer"
+            risk_level = churn_analysis.get("risk_level")
+            if risk_level in HIGH_CHURN_RISK_LEVELS:
+                if not intervention_needed:
+                    intervention_needed = True
+                    intervention_type = "proactive_offer"
                 
-                risk_reason = f"检测到{churn_analysis.get('risk_level')}流失风险"
-                if decision["intervention_reason"]:
-                    decision["intervention_reason"] += f"，同时{risk_reason}"
+                risk_reason = CHURN_REASON_TEMPLATE.format(risk_level=risk_level)
+                if intervention_reason:
+                    intervention_reason += f"，同时{risk_reason}"
                 else:
-                    decision["intervention_reason"] = risk_reason
+                    intervention_reason = risk_reason
                 
-                decision["context"]["churn_risk"] = churn_analysis.get("risk_level")
+                context["churn_risk"] = risk_level
             
             # 如果深度分析没有发现问题，但规则建议干预，采用规则建议
-            if not decision["intervention_needed"] and rule_result["intervention_suggested"]:
-                decision["intervention_needed"] = True
-                decision["suggested_intervention_type"] = rule_result["suggested_type"]
-                decision["intervention_reason"] = rule_result["reason"] + "（基于规则预筛选）"
-            
+            if not intervention_needed and rule_result["intervention_suggested"]:
+                intervention_needed = True
+                intervention_type = rule_result["suggested_type"]
+                intervention_reason = rule_result["reason"] + "（基于规则预筛选）"
+            
+            decision["intervention_needed"] = intervention_needed
+            decision["suggested_intervention_type"] = intervention_type
+            decision["intervention_reason"] = intervention_reason
             # 生成情绪摘要
-            if mood_summary_parts:
-                decision["player_mood_summary"] = ", ".join(mood_summary_parts)
-            else:
-                decision["player_mood_summary"] = "情绪状态正常"
+            decision["player_mood_summary"] = mood_summary or "情绪状态正常"
             
         except Exception as e:
             self.logger.error(f"最终决策时出错: {e}")
@@ -1060,52 +1980,37 @@ Thought: {agent_scratchpad}
         }
         
         try:
-            # 规则1: 高挫折等级检查
-            if player.frustration_level > 5:
-                result["needs_deep_analysis"] = True
-                result["intervention_suggested"] = True
-                result["reason"] = f"玩家挫折等级过高 ({player.frustration_level})，需要安慰干预"
-                result["suggested_type"] = "comfort"
-                result["context"]["frustration_level"] = player.frustration_level
-                return result
-            
-            # 规则2: 连续失败检查
-            if player.consecutive_failures >= 3:
-                result["needs_deep_analysis"] = True
-                result["intervention_suggested"] = True
-                result["reason"] = f"玩家连续失败次数过多 ({player.consecutive_failures})，需要引导干预"
-                result["suggested_type"] = "guidance"
-                result["context"]["consecutive_failures"] = player.consecutive_failures
-                return result
-            
-            # 规则3: VIP玩家特殊关怀
-            if player.vip_level >= 5 and player.total_spent > 1000:
-                result["needs_deep_analysis"] = True
-                result["intervention_suggested"] = True
-                result["reason"] = f"高价值VIP玩家 (VIP{player.vip_level}, 消费${player.total_spent})，需要主动关怀"
-                result["suggested_type"] = "proactive_offer"
-                result["context"]["vip_level"] = player.vip_level
-                result["context"]["total_spent"] = player.total_spent
-                return result
+            # 规则1-3: 挫折等级、连续失败、高价值VIP，按 PRESCREEN_RULES 的顺序命中即返回
+            values = _prescreen_features(player)
+            for predicate, reason_template, suggested_type, context_keys in PRESCREEN_RULES:
+                if predicate(*values):
+                    features = dict(zip(PRESCREEN_FEATURE_NAMES, values))
+                    result["needs_deep_analysis"] = True
+                    result["intervention_suggested"] = True
+                    result["reason"] = reason_template.format_map(features)
+                    result["suggested_type"] = suggested_type
+                    result["context"] = {key: features[key] for key in context_keys}
+                    return result
             
             # 规则4: 检查触发动作类型
             triggering_actions = trigger_context.get("triggering_actions", [])
             if triggering_actions:
-                action = triggering_actions[0]  # 取第一个动作
-                if hasattr(action, 'action_type'):
-                    action_type = action.action_type.value if hasattr(action.action_type, 'value') else str(action.action_type)
-                    if action_type in ["battle_failure", "card_draw_failure"]:
+                # 取第一个动作；动作类型通常是 ActionType 枚举，也兼容字符串
+                action_type = getattr(triggering_actions[0], "action_type", None)
+                if action_type is not None:
+                    action_type = action_type.value if isinstance(action_type, Enum) else str(action_type)
+                    if action_type in FAILURE_ACTION_TYPES:
                         result["needs_deep_analysis"] = True
-                        result["reason"] = f"检测到失败类型动作 ({action_type})，需要深度情绪分析"
+                        result["reason"] = FAILURE_ACTION_REASON_TEMPLATE.format(action_type=action_type)
                         result["context"]["trigger_action_type"] = action_type
                         return result
             
             # 如果没有触发任何规则，不需要深度分析
             result["reason"] = "玩家状态正常，无需干预"
             result["context"] = {
-                "frustration_level": player.frustration_level,
-                "consecutive_failures": player.consecutive_failures,
-                "vip_level": player.vip_level
+                "frustration_level": values[0],
+                "consecutive_failures": values[1],
+                "vip_level": values[2]
             }
             
         except Exception as e:
@@ -1195,8 +2100,6 @@ Thought: {agent_scratchpad}
         except Exception as e:
             self.logger.error(f"为规则引擎结果添加情绪干预时出错: {e}")
             return result
-        self.memory_manager.cleanup_old_memories(max_age_hours)
-        self.logger.info(f"清理了超过 {max_age_hours} 小时的旧数据")
     
     def export_session_data(self) -> Dict[str, Any]:
         """导出会话数据
@@ -1204,9 +2107,17 @@ Thought: {agent_scratchpad}
         Returns:
             Dict[str, Any]: 会话数据
         """
+        # 先写完已入队的交互记录，导出内容才完整
+        self.flush_memory_writes()
+        
+        # 同一次导出共用一个时间点，记忆统计直接取自智能体统计
+        now = datetime.now()
+        agent_stats = self.get_agent_stats()
+        with self._memory_lock:
+            active_players = self.memory_manager.get_all_active_players(now=now.timestamp())
         return {
-            "agent_stats": self.get_agent_stats(),
-            "memory_stats": self.memory_manager.get_memory_stats(),
-            "active_players": self.memory_manager.get_all_active_players(),
-            "export_timestamp": datetime.now().isoformat()
+            "agent_stats": agent_stats,
+            "memory_stats": agent_stats["memory_stats"],
+            "active_players": active_players,
+            "export_timestamp": now.isoformat()
         }
\ No newline at end of file
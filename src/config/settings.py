@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     model_retry_count: int = 3
     model_retry_delay: int = 1
     model_timeout: int = 30
+    model_max_connections: int = 50  # 共享HTTP连接池的最大连接数
     
     # 兼容性配置（保持向后兼容）
     openai_api_key: Optional[str] = None
@@ -19,6 +20,11 @@ class Settings(BaseSettings):
     # 智能体配置
     agent_max_iterations: int = 10
     agent_memory_window: int = 20
+    agent_max_players: int = 10000  # 记忆管理器强引用保留的最近活跃玩家数
+    response_cache_enabled: bool = False  # 干预决策完全相同时复用Agent的工具输出，投递类工具仍重新执行；默认关闭
+    response_cache_size: int = 256
+    deep_analysis_cache_ttl: float = 60.0  # 相同行为数据的深度分析结果复用时长（秒），0表示不缓存
+    deep_analysis_cache_size: int = 4096
     
     # 游戏数据配置
     data_dir: str = "data"
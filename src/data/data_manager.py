@@ -53,6 +53,24 @@ class DataManager:
             elif action.is_success():
                 player.reset_failures()
     
+    def add_actions(self, actions: List[PlayerAction]):
+        """批量添加玩家行为记录
+        
+        Args:
+            actions: 按发生顺序排列的行为列表
+        """
+        self.action_history.extend(actions)
+        
+        # 按顺序更新玩家状态，与逐条 add_action 的结果一致
+        players = self.players
+        for action in actions:
+            player = players.get(action.player_id)
+            if player:
+                if action.is_failure():
+                    player.increment_failures()
+                elif action.is_success():
+                    player.reset_failures()
+    
     def get_player_actions(self, 
                           player_id: str, 
                           limit: int = 50,
@@ -2,7 +2,7 @@ import json
 import random
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from src.models.player import Player, PlayerStatus
@@ -103,8 +103,41 @@ class MockDataGenerator:
             sequence_type: 序列类型 (normal, frustration, success, mixed)
             count: 生成的行为数量
         """
-        actions = []
         base_time = datetime.now() - timedelta(minutes=30)
+        actions = self._build_action_sequence(player_id, sequence_type, count, base_time)
+        self.action_history.extend(actions)
+        return actions
+    
+    def generate_action_batch(self, specs: List[Tuple[str, str, int]]) -> List[PlayerAction]:
+        """一次生成多个玩家的行为序列
+        
+        Args:
+            specs: (玩家ID, 序列类型, 数量) 列表
+            
+        Returns:
+            List[PlayerAction]: 按 specs 顺序拼接的行为列表
+        """
+        base_time = datetime.now() - timedelta(minutes=30)
+        actions = []
+        for player_id, sequence_type, count in specs:
+            actions.extend(self._build_action_sequence(player_id, sequence_type, count, base_time))
+        self.action_history.extend(actions)
+        return actions
+    
+    def _build_action_sequence(self, 
+                               player_id: str,
+                               sequence_type: str,
+                               count: int,
+                               base_time: datetime) -> List[PlayerAction]:
+        """构建行为序列（不写入历史）
+        
+        Args:
+            player_id: 玩家ID
+            sequence_type: 序列类型
+            count: 生成的行为数量
+            base_time: 序列起始时间
+        """
+        actions = []
         
         for i in range(count):
             action_time = base_time + timedelta(minutes=i * 2 + random.uniform(0, 2))
@@ -134,7 +167,6 @@ class MockDataGenerator:
             )
             
             actions.append(action)
-            self.action_history.append(action)
         
         return actions
     
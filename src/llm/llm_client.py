@@ -13,6 +13,11 @@ try:
 except ImportError:
     Ark = None
 
+try:
+    from langchain.schema import HumanMessage, SystemMessage, AIMessage
+except ImportError:
+    HumanMessage = SystemMessage = AIMessage = None
+
 
 class LLMClient:
     """统一的LLM客户端，支持多种模型提供商"""
@@ -23,7 +28,8 @@ class LLMClient:
                  base_url: Optional[str] = None,
                  timeout: int = 30,
                  max_retries: int = 3,
-                 provider: str = "openai"):
+                 provider: str = "openai",
+                 http_client: Optional[Any] = None):
         """
         初始化LLM客户端
         
@@ -34,6 +40,7 @@ class LLMClient:
             timeout: 超时时间
             max_retries: 最大重试次数
             provider: 提供商类型 (openai, volces)
+            http_client: 共享的 httpx.Client（可选），不传时由SDK自建连接池
         """
         self.model_name = model_name
         self.api_key = api_key
@@ -41,6 +48,7 @@ class LLMClient:
         self.timeout = timeout
         self.max_retries = max_retries
         self.provider = provider
+        self.http_client = http_client
         self.logger = logging.getLogger(__name__)
         
         # 初始化客户端
@@ -62,6 +70,8 @@ class LLMClient:
                 
                 if self.base_url:
                     client_kwargs["base_url"] = self.base_url
+                if self.http_client is not None:
+                    client_kwargs["http_client"] = self.http_client
                 
                 return ChatOpenAI(**client_kwargs)
             
@@ -71,7 +81,8 @@ class LLMClient:
                 
                 return Ark(
                     api_key=self.api_key,
-                    base_url=self.base_url or "https://ark.cn-beijing.volces.com/api/v3"
+                    base_url=self.base_url or "https://ark.cn-beijing.volces.com/api/v3",
+                    http_client=self.http_client
                 )
             
             else:
@@ -101,40 +112,26 @@ class LLMClient:
         
         try:
             if self.provider.lower() == "openai":
-                # 转换消息格式为langchain格式
-                from langchain.schema import HumanMessage, SystemMessage, AIMessage
-                
-                langchain_messages = []
-                for msg in messages:
-                    if msg["role"] == "system":
-                        langchain_messages.append(SystemMessage(content=msg["content"]))
-                    elif msg["role"] == "user":
-                        langchain_messages.append(HumanMessage(content=msg["content"]))
-                    elif msg["role"] == "assistant":
-                        langchain_messages.append(AIMessage(content=msg["content"]))
+                # 转换消息格式为langchain格式，按角色查表得到消息类，未知角色跳过
+                message_classes = {
+                    "system": SystemMessage,
+                    "user": HumanMessage,
+                    "assistant": AIMessage
+                }
+                langchain_messages = [
+                    message_classes[msg["role"]](content=msg["content"])
+                    for msg in messages
+                    if msg["role"] in message_classes
+                ]
                 
                 # 设置参数
                 kwargs = {"temperature": temperature}
                 if max_tokens:
                     kwargs["max_tokens"] = max_tokens
                 
-                # 临时设置参数
-                original_temp = getattr(self._client, 'temperature', None)
-                original_max_tokens = getattr(self._client, 'max_tokens', None)
-                
-                self._client.temperature = temperature
-                if max_tokens:
-                    self._client.max_tokens = max_tokens
-                
-                try:
-                    response = self._client.invoke(langchain_messages)
-                    return response.content
-                finally:
-                    # 恢复原始参数
-                    if original_temp is not None:
-                        self._client.temperature = original_temp
-                    if original_max_tokens is not None:
-                        self._client.max_tokens = original_max_tokens
+                # 参数按调用绑定，不修改共享的客户端，多线程并发调用时互不影响
+                response = self._client.bind(**kwargs).invoke(langchain_messages)
+                return response.content
             
             elif self.provider.lower() == "volces":
                 # Volces API调用
@@ -1,9 +1,16 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, BinaryIO
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
 import time
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..models.player import Player, PlayerStatus
 from ..models.action import PlayerAction, ActionType
 from ..models.trigger import TriggerEvent
@@ -46,6 +53,8 @@ class FrustrationScenario:
         self.scenario_actions: List[PlayerAction] = []
         self.triggered_events: List[TriggerEvent] = []
         self.intervention_results: List[Dict[str, Any]] = []
+        # 逐条写出干预和邮件记录的JSONL输出（可选）
+        self.report_stream: Optional[BinaryIO] = None
         
         # 场景配置
         self.scenario_config = {
@@ -59,12 +68,17 @@ class FrustrationScenario:
         
         self.logger.info("受挫场景初始化完成")
     
-    def run_frustraion_complete_scenario(self) -> Dict[str, Any]:
+    def run_frustraion_complete_scenario(self, report_stream: Optional[BinaryIO] = None) -> Dict[str, Any]:
         """运行完整的受挫场景
         
+        Args:
+            report_stream: 以二进制写模式打开的JSONL文件。提供时干预和邮件记录
+                在产生时逐行写出，返回的报告只包含汇总数量
+        
         Returns:
             Dict[str, Any]: 场景运行结果
         """
+        self.report_stream = report_stream
         self.logger.info("开始运行受挫场景")
         
         try:
@@ -170,35 +184,76 @@ class FrustrationScenario:
         
         self.logger.info("开始智能体干预...")
         
-        # 处理每个触发事件
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._aintervene_all_players())
+        else:
+            # 调用方已在事件循环中时不能再 asyncio.run，改在独立线程中运行新的事件循环
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(asyncio.run, self._aintervene_all_players()).result()
+        
+        self.logger.info(f"智能体干预完成，处理了 {len(self.intervention_results)} 个事件")
+    
+    async def _aintervene_all_players(self):
+        """按玩家分组处理触发事件，不同玩家之间并发"""
+        events_by_player: Dict[str, List[TriggerEvent]] = {}
         for event in self.triggered_events:
+            events_by_player.setdefault(event.player_id, []).append(event)
+        
+        await asyncio.gather(*(
+            self._aintervene_player(player_id, events)
+            for player_id, events in events_by_player.items()
+        ))
+    
+    async def _aintervene_player(self, player_id: str, events: List[TriggerEvent]):
+        """依次处理同一玩家的触发事件
+        
+        前一次干预会重置连续失败计数并降低受挫程度，后续事件要基于更新后的状态判断，
+        因此同一玩家的事件必须串行处理
+        
+        Args:
+            player_id: 玩家ID
+            events: 该玩家的触发事件列表
+        """
+        for event in events:
             try:
                 self.logger.info(f"处理触发事件: {event.trigger_condition.name}")
                 
                 # 等待一段时间模拟处理延迟
-                time.sleep(self.scenario_config["intervention_delay_seconds"])
+                await asyncio.sleep(self.scenario_config["intervention_delay_seconds"])
                 
                 # 调用智能体处理
-                result = self.agent.process_trigger_event(player_id=self.scenario_player.player_id,trigger_context=event)
+                result = await self.agent.arun_intervention(player_id=player_id, trigger_context=event)
                 
-                self.intervention_results.append({
+                record = {
                     "event_id": event.event_id,
                     "condition_name": event.trigger_condition.name,
                     "result": result,
                     "timestamp": datetime.now().isoformat()
-                })
+                }
+                if self.report_stream is not None:
+                    self._write_report_line("intervention", record)
+                    # 内存中只保留统计指标需要的字段
+                    record["result"] = {
+                        "status": result.get("status"),
+                        "intervention_type": result.get("intervention_type")
+                    }
+                self.intervention_results.append(record)
                 
                 self.logger.info(f"干预结果: {result.get('status', 'unknown')}")
                 
             except Exception as e:
                 self.logger.error(f"处理触发事件时出错: {e}")
-                self.intervention_results.append({
+                record = {
                     "event_id": event.event_id,
                     "error": str(e),
                     "timestamp": datetime.now().isoformat()
-                })
-        
-        self.logger.info(f"智能体干预完成，处理了 {len(self.intervention_results)} 个事件")
+                }
+                if self.report_stream is not None:
+                    # 错误记录同样写入JSONL，与汇总中的干预计数保持一致
+                    self._write_report_line("intervention", record)
+                self.intervention_results.append(record)
     
     def _evaluate_results(self) -> Dict[str, Any]:
         """评估结果"""
@@ -225,6 +280,26 @@ class FrustrationScenario:
         # 计算干预效果指标
         intervention_metrics = self._calculate_intervention_metrics()
         
+        mail_records = (
+            {
+                "mail_id": mail.mail_id,
+                "title": mail.title,
+                "content": mail.content[:100] + "..." if len(mail.content) > 100 else mail.content,
+                "attachments": mail.attachments,
+                "timestamp": mail.timestamp.isoformat()
+            }
+            for mail in mail_history
+        )
+        if self.report_stream is not None:
+            # 记录已写入JSONL，报告中只保留数量
+            for mail_record in mail_records:
+                self._write_report_line("mail", mail_record)
+            interventions = {"count": len(self.intervention_results)}
+            mails = {"count": len(mail_history)}
+        else:
+            interventions = self.intervention_results
+            mails = list(mail_records)
+        
         # 生成场景报告
         scenario_report = {
             "scenario_info": {
@@ -263,17 +338,8 @@ class FrustrationScenario:
                 }
                 for event in self.triggered_events
             ],
-            "interventions": self.intervention_results,
-            "mail_history": [
-                {
-                    "mail_id": mail.mail_id,
-                    "title": mail.title,
-                    "content": mail.content[:100] + "..." if len(mail.content) > 100 else mail.content,
-                    "attachments": mail.attachments,
-                    "timestamp": mail.timestamp.isoformat()
-                }
-                for mail in mail_history
-            ],
+            "interventions": interventions,
+            "mail_history": mails,
             "behavior_analysis": behavior_analysis,
             "intervention_metrics": intervention_metrics,
             "success_indicators": self._evaluate_success_indicators(updated_player, mail_history)
@@ -285,6 +351,21 @@ class FrustrationScenario:
         self.logger.info("场景结果评估完成")
         return scenario_report
     
+    def _write_report_line(self, record_type: str, record: Dict[str, Any]):
+        """向JSONL输出写入一条记录并立即刷新
+        
+        Args:
+            record_type: 记录类型（intervention / mail）
+            record: 记录内容
+        """
+        line = {"record_type": record_type, **record}
+        if orjson is not None:
+            data = orjson.dumps(line, default=str, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(line, ensure_ascii=False, default=str).encode("utf-8")
+        self.report_stream.write(data + b"\n")
+        self.report_stream.flush()
+    
     def _calculate_intervention_metrics(self) -> Dict[str, Any]:
         """计算干预效果指标
         
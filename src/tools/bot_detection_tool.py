@@ -2,14 +2,20 @@ from typing import Dict, List, Optional, Any ,Type, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 import json
+import logging
+import re
 from datetime import datetime
-import traceback
 
 # 假设这些类从您的项目中导入
 from ..models.player import Player, BotRiskLevel
 from ..llm.llm_client import LLMClient
 from ..data.data_manager import DataManager # 显式导入DataManager
 
+logger = logging.getLogger(__name__)
+
+# 从LLM响应中截取JSON对象
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
 class BotDetectionInput(BaseModel):
     """机器人检测工具输入参数"""
     player_id: str = Field(description="玩家ID")
@@ -84,7 +90,7 @@ class BotDetectionTool(BaseTool):
             return json.dumps(detection_result, ensure_ascii=False, indent=2)
             
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("机器人检测失败 player=%s", player_id)
             error_result = {
                 "success": False,
                 "error": str(e),
@@ -124,8 +130,7 @@ class BotDetectionTool(BaseTool):
             if response.strip().startswith('{'):
                 return json.loads(response)
             
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = JSON_OBJECT_PATTERN.search(response)
             if json_match:
                 return json.loads(json_match.group())
             
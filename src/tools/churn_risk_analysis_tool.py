@@ -2,14 +2,20 @@ from typing import Dict, List, Optional, Any , Type, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 import json
+import logging
+import re
 from datetime import datetime, timedelta
-import traceback
 
 # 假设这些类从您的项目中导入
 from ..models.player import Player, ChurnRiskLevel
 from ..llm.llm_client import LLMClient
 from ..data.data_manager import DataManager # 显式导入DataManager以获得更好的类型提示
 
+logger = logging.getLogger(__name__)
+
+# 从LLM响应中截取JSON对象
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
 class ChurnRiskAnalysisInput(BaseModel):
     """流失风险分析工具输入参数"""
     player_id: str = Field(description="玩家ID")
@@ -81,7 +87,7 @@ class ChurnRiskAnalysisTool(BaseTool):
             return json.dumps(analysis_result, ensure_ascii=False, indent=2)
             
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("流失风险分析失败 player=%s", player_id)
             error_result = {
                 "success": False,
                 "error": str(e),
@@ -123,8 +129,7 @@ class ChurnRiskAnalysisTool(BaseTool):
             if response.strip().startswith('{'):
                 return json.loads(response)
             
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = JSON_OBJECT_PATTERN.search(response)
             if json_match:
                 return json.loads(json_match.group())
             
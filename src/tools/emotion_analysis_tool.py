@@ -2,14 +2,20 @@ from typing import Dict, List, Optional, Any , Type, Union
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 import json
+import logging
+import re
 from datetime import datetime
-import traceback
 
 # 假设这些类从您的项目中导入
 from src.models.player import Player, EmotionType
 from src.llm.llm_client import LLMClient
 from src.data.data_manager import DataManager # 显式导入DataManager以获得更好的类型提示
 
+logger = logging.getLogger(__name__)
+
+# 从LLM响应中截取JSON对象
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
 class EmotionAnalysisInput(BaseModel):
     """情绪分析工具输入参数"""
     player_id: str = Field(description="玩家ID")
@@ -52,8 +58,12 @@ class EmotionAnalysisTool(BaseTool):
         return tool_input
 
     def _run(self, player_id: str, behavior_data: Dict[str, Any], 
-             context: Optional[str] = None, analysis_depth: str = "standard") -> str:
-        """执行情绪分析"""
+             context: Optional[str] = None, analysis_depth: str = "standard",
+             behavior_data_json: Optional[str] = None) -> str:
+        """执行情绪分析
+
+        behavior_data_json 为调用方已序列化好的行为数据，提供时直接写入提示词，不再重复序列化
+        """
         try:
             print("_get_player_info:",player_id)
             print("self.data_manager:",self.data_manager)
@@ -65,7 +75,7 @@ class EmotionAnalysisTool(BaseTool):
             print("分析上下文:", context)
             
             analysis_prompt = self._build_analysis_prompt(
-                player, behavior_data, context, analysis_depth
+                player, behavior_data, context, analysis_depth, behavior_data_json
             )
             
             response = self.llm_client.chat_completion(
@@ -86,7 +96,7 @@ class EmotionAnalysisTool(BaseTool):
             return json.dumps(analysis_result, ensure_ascii=False, indent=2)
             
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("情绪分析失败 player=%s", player_id)
             error_result = {
                 "success": False,
                 "error": str(e),
@@ -103,7 +113,8 @@ class EmotionAnalysisTool(BaseTool):
 """
     
     def _build_analysis_prompt(self, player: Player, behavior_data: Dict[str, Any], 
-                              context: Optional[str], analysis_depth: str) -> str:
+                              context: Optional[str], analysis_depth: str,
+                              behavior_data_json: Optional[str] = None) -> str:
         """构建分析提示"""
         # 此方法逻辑保持不变
         prompt_parts = []
@@ -124,9 +135,11 @@ class EmotionAnalysisTool(BaseTool):
 最近情绪历史：
 {json.dumps(player.emotion_history[-3:], ensure_ascii=False, indent=2)}
 """)
+        if behavior_data_json is None:
+            behavior_data_json = json.dumps(behavior_data, ensure_ascii=False, indent=2, default=str)
         prompt_parts.append(f"""
 当前行为数据：
-{json.dumps(behavior_data, ensure_ascii=False, indent=2)}
+{behavior_data_json}
 """)
         # ... (后续 prompt 构建逻辑保持不变)
         return "\n".join(prompt_parts)
@@ -139,8 +152,7 @@ class EmotionAnalysisTool(BaseTool):
             if response.strip().startswith('{'):
                 return json.loads(response)
             
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = JSON_OBJECT_PATTERN.search(response)
             if json_match:
                 return json.loads(json_match.group())
             
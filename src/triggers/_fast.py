@@ -0,0 +1,146 @@
+"""行为评分的数值内核
+
+把行为列表编码为NumPy数组后一次性完成计数、情绪累计和波动性计算；
+安装了numba时内核会被JIT编译，否则以普通Python函数运行
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+from ..models.action import PlayerAction, ActionType
+
+# 行为类型 -> 整数编号
+ACTION_TYPE_IDS = {action_type: index for index, action_type in enumerate(ActionType)}
+
+# 结果编码
+OUTCOME_NONE = 0
+OUTCOME_SUCCESS = 1
+OUTCOME_FAILURE = 2
+
+
+def _build_flag_table(action_types) -> np.ndarray:
+    """按行为类型编号构建布尔查找表"""
+    table = np.zeros(len(ACTION_TYPE_IDS), dtype=np.bool_)
+    for action_type in action_types:
+        table[ACTION_TYPE_IDS[action_type]] = True
+    return table
+
+
+# 与 PlayerAction 上的判定方法保持一致
+FAILURE_TABLE = _build_flag_table([
+    ActionType.BATTLE_LOSE,
+    ActionType.RAGE_QUIT,
+    ActionType.COMPLAIN,
+    ActionType.ATTACK_CITY,
+    ActionType.IDLE_TIMEOUT
+])
+SUCCESS_TABLE = _build_flag_table([
+    ActionType.BATTLE_WIN,
+    ActionType.LEVEL_UP,
+    ActionType.COMPLETE_QUEST,
+    ActionType.PURCHASE
+])
+SOCIAL_TABLE = _build_flag_table([
+    ActionType.CHAT_WORLD,
+    ActionType.CHAT_GUILD,
+    ActionType.CHAT_PRIVATE,
+    ActionType.JOIN_GUILD
+])
+HELP_SEEKING_TABLE = _build_flag_table([
+    ActionType.OPEN_GUIDE,
+    ActionType.CHAT_WORLD,
+    ActionType.COMPLAIN
+])
+IMPACT_TABLE = np.zeros(len(ACTION_TYPE_IDS), dtype=np.int64)
+for _action_type, _impact in {
+    ActionType.BATTLE_WIN: 3,
+    ActionType.LEVEL_UP: 4,
+    ActionType.COMPLETE_QUEST: 2,
+    ActionType.PURCHASE: 1,
+    ActionType.JOIN_GUILD: 2,
+    ActionType.BATTLE_LOSE: -2,
+    ActionType.RAGE_QUIT: -5,
+    ActionType.COMPLAIN: -3,
+    ActionType.IDLE_TIMEOUT: -1,
+    ActionType.LEAVE_GUILD: -2
+}.items():
+    IMPACT_TABLE[ACTION_TYPE_IDS[_action_type]] = _impact
+
+
+def encode_actions(actions: List[PlayerAction]) -> Tuple[np.ndarray, np.ndarray]:
+    """把行为列表编码为类型编号和结果编码数组
+
+    Args:
+        actions: 行为列表
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (类型编号 int32, 结果编码 int8)
+    """
+    count = len(actions)
+    type_ids = np.empty(count, dtype=np.int32)
+    outcomes = np.zeros(count, dtype=np.int8)
+    for index, action in enumerate(actions):
+        type_ids[index] = ACTION_TYPE_IDS[action.action_type]
+        if action.result == "success":
+            outcomes[index] = OUTCOME_SUCCESS
+        elif action.result == "failure":
+            outcomes[index] = OUTCOME_FAILURE
+    return type_ids, outcomes
+
+
+def _score_actions(type_ids, outcomes, failure_table, success_table,
+                   social_table, help_table, impact_table):
+    count = type_ids.shape[0]
+    failure_count = 0
+    success_count = 0
+    social_count = 0
+    help_count = 0
+    cumulative = np.empty(count, dtype=np.int64)
+    running = 0
+    change_sum = 0.0
+
+    for i in range(count):
+        type_id = type_ids[i]
+        if failure_table[type_id] or outcomes[i] == OUTCOME_FAILURE:
+            failure_count += 1
+        if success_table[type_id] or outcomes[i] == OUTCOME_SUCCESS:
+            success_count += 1
+        if social_table[type_id]:
+            social_count += 1
+        if help_table[type_id]:
+            help_count += 1
+
+        impact = impact_table[type_id]
+        running += impact
+        cumulative[i] = running
+        if i > 0:
+            change_sum += abs(impact)
+
+    volatility = change_sum / (count - 1) if count > 1 else 0.0
+    return failure_count, success_count, social_count, help_count, cumulative, volatility
+
+
+_score_actions_kernel = (
+    njit(cache=True, fastmath=True)(_score_actions) if njit is not None else _score_actions
+)
+
+
+def score_actions(type_ids: np.ndarray, outcomes: np.ndarray):
+    """计算行为序列的计数、情绪累计分数和波动性
+
+    Args:
+        type_ids: 按时间升序排列的行为类型编号
+        outcomes: 对应的结果编码
+
+    Returns:
+        tuple: (失败数, 成功数, 社交数, 求助数, 累计情绪分数数组, 情绪波动性)
+    """
+    return _score_actions_kernel(
+        type_ids, outcomes, FAILURE_TABLE, SUCCESS_TABLE,
+        SOCIAL_TABLE, HELP_SEEKING_TABLE, IMPACT_TABLE
+    )
@@ -7,6 +7,7 @@ from ..models.player import Player
 from ..models.action import PlayerAction, ActionType
 from ..models.trigger import TriggerCondition, TriggerEvent, TriggerType
 from ..data.data_manager import DataManager
+from ._fast import encode_actions, score_actions
 
 class BehaviorAnalyzer:
     """玩家行为分析器
@@ -108,14 +109,18 @@ class BehaviorAnalyzer:
                 "confidence": 0.0
             }
         
+        # 按时间升序编码一次，计数和情绪累计共用同一次内核计算
+        sorted_actions = sorted(actions, key=lambda x: x.timestamp)
+        scores = score_actions(*encode_actions(sorted_actions))
+        
         # 基础统计分析
-        basic_stats = self._analyze_basic_statistics(actions)
+        basic_stats = self._analyze_basic_statistics(actions, scores)
         
         # 行为序列分析
         sequence_analysis = self._analyze_action_sequences(actions)
         
         # 情绪轨迹分析
-        emotional_analysis = self._analyze_emotional_trajectory(actions)
+        emotional_analysis = self._analyze_emotional_trajectory(sorted_actions, scores, presorted=True)
         
         # 时间模式分析
         temporal_analysis = self._analyze_temporal_patterns(actions)
@@ -155,20 +160,25 @@ class BehaviorAnalyzer:
             "intervention_suggestion": intervention_suggestion
         }
     
-    def _analyze_basic_statistics(self, actions: List[PlayerAction]) -> Dict[str, Any]:
+    def _analyze_basic_statistics(self, 
+                                  actions: List[PlayerAction],
+                                  scores: Optional[tuple] = None) -> Dict[str, Any]:
         """分析基础统计信息
         
         Args:
             actions: 行为列表
+            scores: score_actions 的计算结果（可选，未提供时现场计算）
             
         Returns:
             Dict[str, Any]: 基础统计结果
         """
+        if scores is None:
+            scores = score_actions(*encode_actions(actions))
+        
         total_actions = len(actions)
-        failure_count = sum(1 for action in actions if action.is_failure())
-        success_count = sum(1 for action in actions if action.is_success())
-        social_count = sum(1 for action in actions if action.is_social_activity())
-        help_seeking_count = sum(1 for action in actions if action.is_help_seeking())
+        failure_count, success_count, social_count, help_seeking_count = (
+            int(count) for count in scores[:4]
+        )
         
         # 按行为类型统计
         action_type_counts = defaultdict(int)
@@ -238,11 +248,16 @@ class BehaviorAnalyzer:
             })
         }
     
-    def _analyze_emotional_trajectory(self, actions: List[PlayerAction]) -> Dict[str, Any]:
+    def _analyze_emotional_trajectory(self, 
+                                      actions: List[PlayerAction],
+                                      scores: Optional[tuple] = None,
+                                      presorted: bool = False) -> Dict[str, Any]:
         """分析情绪轨迹
         
         Args:
             actions: 行为列表
+            scores: 按时间升序计算的 score_actions 结果（可选）
+            presorted: actions 是否已按时间升序排列
             
         Returns:
             Dict[str, Any]: 情绪分析结果
@@ -251,21 +266,24 @@ class BehaviorAnalyzer:
             return {"current_state": "unknown", "trajectory": "stable"}
         
         # 按时间排序
-        sorted_actions = sorted(actions, key=lambda x: x.timestamp)
+        sorted_actions = actions if presorted else sorted(actions, key=lambda x: x.timestamp)
+        if scores is None:
+            scores = score_actions(*encode_actions(sorted_actions))
+        cumulative_scores = scores[4].tolist()
         
         # 计算情绪轨迹点
         emotional_points = []
-        cumulative_score = 0
+        previous_score = 0
         
-        for action in sorted_actions:
-            impact = action.get_emotional_impact()
-            cumulative_score += impact
+        for action, cumulative_score in zip(sorted_actions, cumulative_scores):
             emotional_points.append({
                 "timestamp": action.timestamp,
-                "impact": impact,
+                "impact": cumulative_score - previous_score,
                 "cumulative_score": cumulative_score,
                 "action_type": action.action_type.value
             })
+            previous_score = cumulative_score
+        cumulative_score = previous_score
         
         # 分析趋势
         trajectory = self._analyze_emotional_trend(emotional_points)
@@ -274,7 +292,7 @@ class BehaviorAnalyzer:
         current_state = self._determine_emotional_state(cumulative_score, trajectory)
         
         # 计算情绪波动性
-        volatility = self._calculate_emotional_volatility(emotional_points)
+        volatility = float(scores[5])
         
         return {
             "current_state": current_state,
@@ -718,18 +736,6 @@ class BehaviorAnalyzer:
             else:
                 return "stable"
     
-    def _calculate_emotional_volatility(self, emotional_points: List[Dict]) -> float:
-        """计算情绪波动性"""
-        if len(emotional_points) < 2:
-            return 0.0
-        
-        changes = []
-        for i in range(1, len(emotional_points)):
-            change = abs(emotional_points[i]["cumulative_score"] - emotional_points[i-1]["cumulative_score"])
-            changes.append(change)
-        
-        return sum(changes) / len(changes) if changes else 0.0
-    
     def _identify_session_pattern(self, intervals: List[float]) -> str:
         """识别会话模式"""
         if not intervals:
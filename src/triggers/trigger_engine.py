@@ -6,12 +6,20 @@ import asyncio
 from threading import Thread, Lock
 import time
 
-from ..models.player import Player
+import numpy as np
+
+from ..models.player import Player, BotRiskLevel, ChurnRiskLevel
 from ..models.action import PlayerAction
 from ..models.trigger import TriggerCondition, TriggerEvent, TriggerType, DEFAULT_TRIGGERS
 from ..data.data_manager import DataManager
 from .behavior_analyzer import BehaviorAnalyzer
 import traceback
+
+# 视为需要干预的机器人风险等级和流失风险等级
+HIGH_BOT_RISK_LEVELS = frozenset({BotRiskLevel.HIGH, BotRiskLevel.CONFIRMED})
+HIGH_CHURN_RISK_LEVELS = frozenset({ChurnRiskLevel.HIGH, ChurnRiskLevel.CRITICAL})
+
+
 class TriggerEngine:
     """触发引擎
     
@@ -36,6 +44,8 @@ class TriggerEngine:
         
         # 触发条件管理
         self.trigger_conditions: Dict[str, TriggerCondition] = {}
+        # 玩家过滤阈值矩阵缓存 (条件名列表, N×F 阈值)，条件增删时失效
+        self._filter_thresholds: Optional[tuple] = None
         self.load_default_conditions()
         
         # 事件处理器
@@ -77,6 +87,7 @@ class TriggerEngine:
             condition: 触发条件
         """
         self.trigger_conditions[condition.name] = condition
+        self._filter_thresholds = None
         self.logger.debug(f"添加触发条件: {condition.name}")
     
     def remove_trigger_condition(self, condition_name: str):
@@ -87,6 +98,7 @@ class TriggerEngine:
         """
         if condition_name in self.trigger_conditions:
             del self.trigger_conditions[condition_name]
+            self._filter_thresholds = None
             self.logger.debug(f"移除触发条件: {condition_name}")
     
     def register_event_handler(self, trigger_type: TriggerType, handler: Callable):
@@ -314,6 +326,44 @@ class TriggerEngine:
         
         return True
     
+    def _get_filter_thresholds(self) -> tuple:
+        """获取所有条件的玩家过滤阈值矩阵
+        
+        每行对应一个条件，列依次为最低VIP等级和最低消费金额；
+        未设置的阈值记为 -inf，与 _check_player_filters 的跳过语义一致
+        
+        Returns:
+            tuple: (条件名列表, 阈值矩阵)
+        """
+        if self._filter_thresholds is None:
+            names = list(self.trigger_conditions)
+            thresholds = np.array([
+                [
+                    condition.min_vip_level or -np.inf,
+                    condition.min_total_spent or -np.inf
+                ]
+                for condition in self.trigger_conditions.values()
+            ], dtype=np.float64).reshape(len(names), 2)
+            self._filter_thresholds = (names, thresholds)
+        return self._filter_thresholds
+    
+    def _batch_check_player_filters(self, player: Player) -> Dict[str, bool]:
+        """一次广播比较得到玩家对所有条件的过滤结果
+        
+        Args:
+            player: 玩家对象
+            
+        Returns:
+            Dict[str, bool]: 条件名 -> 是否通过过滤
+        """
+        names, thresholds = self._get_filter_thresholds()
+        features = np.array([
+            player.vip_level,
+            getattr(player, 'total_spent', np.inf)
+        ], dtype=np.float64)
+        passed = (features[None, :] >= thresholds).all(axis=-1)
+        return dict(zip(names, passed.tolist()))
+    
     def _check_consecutive_failures(self, 
                                   player: Player, 
                                   actions: List[PlayerAction], 
@@ -626,6 +676,22 @@ class TriggerEngine:
             print(f"最近行为数量: {len(recent_actions)}")
             print(f"触发条件数量: {len(self.trigger_conditions)}")
             
+            # 一次性计算所有条件的玩家过滤结果
+            filter_results = self._batch_check_player_filters(player)
+            
+            # 获取最近触发行为的时间作为触发时间
+            trigger_time = datetime.now()
+            if recent_actions:
+                # 使用最近行为的时间作为触发时间
+                trigger_time = max(action.timestamp for action in recent_actions[:5])
+            player_status_snapshot = {
+                "level": player.level,
+                "vip_level": player.vip_level,
+                "consecutive_failures": player.consecutive_failures,
+                "frustration_level": player.frustration_level,
+                "status": player.current_status.value
+            }
+            
             # 检查所有触发条件
             for condition_name, condition in self.trigger_conditions.items():
                 try:
@@ -636,7 +702,7 @@ class TriggerEngine:
                     print(f"必需行为类型: {[t.value for t in condition.required_action_types]}")
                     
                     # 检查玩家过滤条件
-                    player_filter_result = self._check_player_filters(player, condition)
+                    player_filter_result = filter_results[condition_name]
                     print(f"玩家过滤结果: {player_filter_result}")
                     
                     if player_filter_result:
@@ -645,26 +711,13 @@ class TriggerEngine:
                         
                         # if condition_result:
                         # 创建触发事件但不执行处理器
-                        
-                        # 获取最近触发行为的时间作为触发时间
-                        trigger_time = datetime.now()
-                        if recent_actions:
-                            # 使用最近行为的时间作为触发时间
-                            trigger_time = max(action.timestamp for action in recent_actions[:5])
-                        
                         trigger_event = TriggerEvent(
                             event_id=f"{player_id}_{condition_name}_{int(trigger_time.timestamp())}",
                             player_id=player_id,
                             trigger_condition=condition,
                             triggered_at=trigger_time,
                             triggering_actions=recent_actions[:5],
-                            player_status_snapshot={
-                                "level": player.level,
-                                "vip_level": player.vip_level,
-                                "consecutive_failures": player.consecutive_failures,
-                                "frustration_level": player.frustration_level,
-                                "status": player.current_status.value
-                            }
+                            player_status_snapshot=dict(player_status_snapshot)
                         )
                         triggered_events.append(trigger_event)
                         
@@ -804,10 +857,7 @@ class TriggerEngine:
                 return False
             
             # 检查机器人风险等级
-            from ..models.player import BotRiskLevel
-            high_risk_levels = [BotRiskLevel.HIGH, BotRiskLevel.CONFIRMED]
-            
-            bot_detected = player.bot_risk_level in high_risk_levels
+            bot_detected = player.bot_risk_level in HIGH_BOT_RISK_LEVELS
             
             if bot_detected:
                 self.logger.info(f"玩家 {player.player_id} 检测到机器人行为: 风险等级={player.bot_risk_level.value}")
@@ -835,10 +885,7 @@ class TriggerEngine:
                 return False
             
             # 检查流失风险等级
-            from ..models.player import ChurnRiskLevel
-            high_risk_levels = [ChurnRiskLevel.HIGH, ChurnRiskLevel.CRITICAL]
-            
-            churn_risk_detected = player.churn_risk_level in high_risk_levels
+            churn_risk_detected = player.churn_risk_level in HIGH_CHURN_RISK_LEVELS
             
             if churn_risk_detected:
                 self.logger.info(f"玩家 {player.player_id} 检测到流失风险: 风险等级={player.churn_risk_level.value}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试深度分析结果缓存
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from datetime import datetime, timedelta
+from src.models.player import Player, PlayerStatus
+from src.agent.smart_game_agent import SmartGameAgent
+from src.data.data_manager import DataManager
+
+
+def test_deep_analysis_cache_shared_across_events():
+    """只有事件ID和触发时间不同的两个触发事件应共用同一份深度分析结果"""
+    print("=== 测试深度分析缓存 ===")
+    
+    agent = SmartGameAgent(data_manager=DataManager())
+    test_player = Player(
+        player_id="test_player_001",
+        username="TestUser",
+        vip_level=3,
+        total_playtime_hours=120,
+        last_login=datetime.now(),
+        total_spent=500.0,
+        current_status=PlayerStatus.ACTIVE,
+        frustration_level=6,
+        consecutive_failures=2,
+        registration_date=datetime.now()
+    )
+    
+    # 替换分析工具调用，只统计调用次数，不访问LLM
+    tool_calls = []
+    
+    def fake_run_analysis_tool(tool_class, label, player_id, behavior_data, behavior_data_json, options):
+        tool_calls.append(label)
+        return {"success": True, "is_bot_probability": 0.0}
+    
+    agent._run_analysis_tool = fake_run_analysis_tool
+    
+    triggered_at = datetime.now()
+    first = agent._perform_deep_analysis(test_player, {
+        "event_id": "test_event_001",
+        "triggered_at": triggered_at,
+        "triggering_actions": []
+    })
+    calls_after_first = len(tool_calls)
+    second = agent._perform_deep_analysis(test_player, {
+        "event_id": "test_event_002",
+        "triggered_at": triggered_at + timedelta(seconds=5),
+        "triggering_actions": []
+    })
+    
+    assert calls_after_first == 3
+    assert len(tool_calls) == calls_after_first
+    assert second == first
+    print("✓ 第二个触发事件命中深度分析缓存")
+
+
+if __name__ == "__main__":
+    test_deep_analysis_cache_shared_across_events()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试行为评分数值内核与 PlayerAction 判定方法的一致性
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from datetime import datetime, timedelta
+from src.models.action import PlayerAction, ActionType
+from src.triggers._fast import encode_actions, score_actions
+
+
+def _build_actions():
+    """构造覆盖全部行为类型和结果取值的行为序列"""
+    base_time = datetime.now()
+    results = [None, "success", "failure", "other"]
+    actions = []
+    for index, action_type in enumerate(list(ActionType) * len(results)):
+        actions.append(PlayerAction(
+            action_id=f"action_{index}",
+            player_id="test_player_001",
+            action_type=action_type,
+            timestamp=base_time + timedelta(seconds=index),
+            result=results[index // len(ActionType)]
+        ))
+    return actions
+
+
+def test_score_actions_matches_player_action():
+    """数值内核的计数、累计情绪分数和波动性应与逐条调用判定方法的结果一致"""
+    print("=== 测试行为评分数值内核 ===")
+    
+    for actions in (_build_actions(), _build_actions()[:1], []):
+        failure_count, success_count, social_count, help_count, cumulative, volatility = \
+            score_actions(*encode_actions(actions))
+        
+        assert failure_count == sum(1 for action in actions if action.is_failure())
+        assert success_count == sum(1 for action in actions if action.is_success())
+        assert social_count == sum(1 for action in actions if action.is_social_activity())
+        assert help_count == sum(1 for action in actions if action.is_help_seeking())
+        
+        expected_cumulative = []
+        cumulative_score = 0
+        for action in actions:
+            cumulative_score += action.get_emotional_impact()
+            expected_cumulative.append(cumulative_score)
+        assert list(cumulative) == expected_cumulative
+        
+        changes = [
+            abs(expected_cumulative[i] - expected_cumulative[i - 1])
+            for i in range(1, len(expected_cumulative))
+        ]
+        expected_volatility = sum(changes) / len(changes) if changes else 0.0
+        assert abs(volatility - expected_volatility) < 1e-9
+        
+        print(f"✓ {len(actions)} 条行为的评分一致")
+
+
+if __name__ == "__main__":
+    test_score_actions_matches_player_action()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试记忆管理器的过期清理
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import time
+from src.agent.memory_manager import MemoryManager
+
+
+def test_cleanup_keeps_players_without_interactions():
+    """只设置过上下文、从未交互的玩家不应被过期清理删除"""
+    print("=== 测试过期清理 ===")
+    
+    memory_manager = MemoryManager()
+    memory_manager.update_player_context("context_only_player", {"vip_level": 5})
+    memory_manager.add_interaction("expired_player", "action", {"action_type": "battle_lose"})
+    
+    # 以两天后的时间清理，已交互的玩家过期，未交互的玩家保留
+    memory_manager.cleanup_old_memories(max_age_hours=24, now=time.time() + 48 * 3600)
+    
+    assert memory_manager.get_player_memory("context_only_player").context == {"vip_level": 5}
+    assert memory_manager.get_player_memory("expired_player").interaction_count == 0
+    print("✓ 未交互玩家的上下文在清理后保留")
+
+
+if __name__ == "__main__":
+    test_cleanup_keeps_players_without_interactions()